@@ -0,0 +1,5 @@
+"""
+Lets ``pytest`` run from the repository root without installing the package:
+pytest puts the directory of this file on sys.path, so the tests import the
+genetictabler in this tree.
+"""
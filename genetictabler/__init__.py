@@ -1,10 +1,19 @@
-from openpyxl import Workbook
-import os
-from openpyxl.utils import get_column_letter
 # -*- coding: utf-8 -*-
 
+import os
+from array import array
+from collections import Counter
+from itertools import accumulate
+from random import Random
+from time import perf_counter
+
+MODES = ("cell", "timetable", "backtracking")
+SEEDINGS = ("random", "constructive")
+STORAGES = ("lists", "compact", "shared")
 
-from random import choice, choices, randint
+# Bump whenever a change alters the tables run() returns for a given seed, so
+# cached results from the previous solver are no longer used.
+SOLVER_VERSION = 4
 
 
 class GenerateTimeTable:
@@ -27,6 +36,27 @@ class GenerateTimeTable:
         max_fitness=100,
         max_generations=50,
         subject_codes_to_names=None,
+        vectorized=False,
+        mode="cell",
+        islands=1,
+        workers=None,
+        migration_interval=10,
+        seed=None,
+        metrics_callback=None,
+        seeding="random",
+        time_budget=None,
+        cache=None,
+        patience=None,
+        min_diversity=0.0,
+        max_evaluations=None,
+        progress_callback=None,
+        resources=None,
+        storage="lists",
+        checkpoint_path=None,
+        checkpoint_interval=60.0,
+        repair_budget=None,
+        crossover_points=1,
+        mutation_rounds=1,
     ):
         """
         Initializes a new instance of the GenerateTimeTable class.
@@ -46,7 +76,104 @@ class GenerateTimeTable:
         max_fitness (int): The maximum fitness score that a timetable can have.
         max_generations (int): The maximum number of generations that the algorithm
             should run for.
+        vectorized (bool): If True, each generation is scored in one NumPy pass by
+            calculate_population_fitness() instead of gene by gene. Requires numpy.
+        mode (str): "cell" runs one small GA per timetable cell, placing a single
+            gene each time. "timetable" runs a single GA whose individuals are
+            complete timetables (see run_timetable_evolution()). "backtracking"
+            fills the timetable with the exact BacktrackingSolver instead of a GA,
+            treating the fitness rules as hard constraints. Its search is
+            bounded by a number of backtracks even without a time_budget, after
+            which the rest of the week is filled greedily, leaving cells that
+            no course fits empty.
+        islands (int): The number of independent populations evolved in parallel
+            by run_island_evolution(). Only used by the "timetable" mode.
+        workers (int): The number of worker processes for the islands. Defaults
+            to one per island, capped at the number of CPUs.
+        migration_interval (int): The number of generations between exchanges of
+            the best individual between neighbouring islands.
+        seed (int): Seed for the instance's random number generator. Every random
+            draw of the algorithm comes from self.rng, and run() reseeds it, so
+            the same configuration and seed always give the same timetable. If
+            None, the generator is seeded from system entropy.
+        metrics_callback (callable): Called as metrics_callback(event, metrics)
+            with an "evolution" event after every GA run and a "run" event with
+            the totals at the end of run(), plus a "repair" event after the
+            repair stage. See run_evolution(), run() and repair() for the
+            metrics reported. When None, no metrics are collected. Island workers
+            run in other processes and do not report evolution events.
+        seeding (str): How the "cell" mode builds each initial population.
+            "random" draws uniformly random genes. "constructive" only targets
+            free cells and courses with remaining quota, and switches to the
+            greedy generate_greedy_population() once few cells are left (see
+            generate_population()).
+        time_budget (float): Seconds that run() may spend solving. Once they are
+            used up, GA runs stop at the end of their current generation, the
+            "cell" mode fills the remaining cells constructively without a GA
+            (see fill_free_cells()), and the "backtracking" mode completes the
+            deepest partial timetable found greedily. None means no limit.
+        cache (MemoryCache or DirectoryCache): A result cache from
+            genetictabler.cache. Seeded runs whose fingerprint is found in it
+            return the stored tables instead of solving again.
+        patience (int): The number of generations a GA run may go without
+            improving its best fitness before it is considered converged and
+            stopped. None runs every GA for the full max_generations.
+        min_diversity (float): The share of distinct individuals in a population
+            below which it has collapsed. Each collapsed generation mutates every
+            child one more time (up to mutation_rounds + 2 times) until the
+            diversity recovers. 0 disables adaptive mutation.
+        max_evaluations (int): The number of individuals that run() may score
+            across all GA runs, treated like an exhausted time_budget once
+            reached. None means no limit.
+        progress_callback (callable): Called as progress_callback(progress)
+            while run() solves, with a dict of cells_placed, total_cells and
+            best_fitness (see report_progress()). An exception raised by the
+            callback aborts the run, which is how genetictabler.aio cancels a
+            solve.
+        resources (Resources): Teachers and rooms from genetictabler.resources.
+            Every placed cell is then assigned a qualified, available and free
+            teacher and room, fitness penalises placements for which none is
+            free instead of comparing course counts with teacher_quota, and
+            teacher_quota becomes the number of qualified teachers per course.
+        storage (str): How the tables and per-class state are stored. "lists"
+            uses nested lists. "compact" uses flat arrays of 16-bit ints behind
+            the same [class][day][slot] indexing (see genetictabler.storage.Grid),
+            for instances with thousands of classes; the views cost some solving
+            speed (about a quarter) in exchange. "shared" is "compact" with
+            the tables in shared memory, so pickling them to another process
+            only sends the memory's name. run() then returns the Grid; its
+            tolist() gives nested lists.
+        checkpoint_path (str): A file that run() saves the solver state to every
+            checkpoint_interval seconds and once it is done, so resume() can
+            continue after a crash (see genetictabler.checkpoint). None disables
+            checkpoints.
+        checkpoint_interval (float): The minimum number of seconds between two
+            checkpoints.
+        repair_budget (float): Seconds of local-search repair that run() spends
+            on the solved timetable, swapping and moving courses within each
+            class to remove adjacent repeats, repeat quota overruns and teacher
+            clashes (see repair()). None skips the repair stage.
+        crossover_points (int): The number of single-point crossovers applied
+            to each pair of parents by run_evolution(): 1 uses
+            single_point_crossover(), more uses multi_point_crossover().
+        mutation_rounds (int): The number of times every child is mutated in
+            each generation of both GA modes. Adaptive mutation (min_diversity)
+            adds up to two more rounds on top.
         """
+        if mode not in MODES:
+            raise ValueError("Invalid mode, expected one of {}.".format(MODES))
+        if islands > 1 and mode != "timetable":
+            raise ValueError("Islands are only supported in the timetable mode.")
+        if seeding not in SEEDINGS:
+            raise ValueError(
+                "Invalid seeding, expected one of {}.".format(SEEDINGS))
+        if storage not in STORAGES:
+            raise ValueError(
+                "Invalid storage, expected one of {}.".format(STORAGES))
+        if crossover_points < 1 or mutation_rounds < 1:
+            raise ValueError(
+                "crossover_points and mutation_rounds must be at least 1.")
+
         self.classes = classes
         self.courses = courses
         self.slots = slots
@@ -63,11 +190,56 @@ class GenerateTimeTable:
         self.course_bits = 0
         self.slot_bits = 0
         self.class_bits = 0
+        self.gene_bits = 0
+        self.course_mask = 0
+        self.slot_mask = 0
+        self.class_mask = 0
         self.total_slots = 0
         self.course_quota = []
         self.teacher_quota = []
         self.repeat_quota = []
         self.tables = []
+        self.day_course_count = []
+        self.slot_course_count = []
+        self.filled_slots = 0
+        self.free_cells = []
+        self.free_cell_index = []
+        self.fitness_cache = {}
+        self.vectorized = vectorized
+        self.mode = mode
+        self.islands = islands
+        self.workers = workers
+        self.migration_interval = migration_interval
+        self.seed = seed
+        self.rng = Random(seed)
+        self.metrics_callback = metrics_callback
+        self.run_metrics = None
+        self.seeding = seeding
+        self.time_budget = time_budget
+        self.patience = patience
+        self.min_diversity = min_diversity
+        self.max_evaluations = max_evaluations
+        self.progress_callback = progress_callback
+        self.resources = resources
+        self.storage = storage
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint = 0.0
+        self.generations_done = 0
+        self.repair_budget = repair_budget
+        self.repair_report = None
+        self.crossover_points = crossover_points
+        self.mutation_rounds = mutation_rounds
+        self.hostable_array = None
+        self.deadline = None
+        self.evaluations = 0
+        self.solver_report = None
+        self.cache = cache
+        self.cache_hit = False
+        self.table_array = None
+        self.course_quota_array = None
+        self.repeat_quota_array = None
+        self.teacher_quota_array = None
         self.subject_codes_to_names = subject_codes_to_names
     def get_subject_name(self, subject_code):
         """
@@ -83,11 +255,15 @@ class GenerateTimeTable:
         timetable(s)'s design in global variables so that they can be easily used
         multiple times throughout the program as per requirement.
 
-        Course_bits, slot_bits and class bits are the lengths of binary string needed
+        Course_bits, slot_bits and class bits are the widths of the bit fields needed
         to represent them respectively. For example if course_count is 8, then the
         maximum course number will b.e 8 which requires 4 bits, hence course_bits will
         be equal to 4.
 
+        A gene is a single int packing the three fields as
+        ``course | slot | class`` (most to least significant), and course_mask,
+        slot_mask and class_mask select each field in place.
+
         Parameters:
         no_courses (int): The number of courses that need to be scheduled.
         classes (int): The number of classes that the timetable should be generated
@@ -112,7 +288,13 @@ class GenerateTimeTable:
         self.total_slots = self.slot_count * self.day_count
         self.course_bits = len(bin(self.course_count)) - 2
         self.slot_bits = len(bin(self.total_slots)) - 2
-        self.class_bits = len(bin(self.course_count)) - 2
+        self.class_bits = len(bin(self.class_count)) - 2
+        self.gene_bits = self.course_bits + self.slot_bits + self.class_bits
+
+        self.class_mask = (1 << self.class_bits) - 1
+        self.slot_mask = ((1 << self.slot_bits) - 1) << self.class_bits
+        self.course_mask = ((1 << self.course_bits) -
+                            1) << (self.slot_bits + self.class_bits)
 
         self.calc_course_quota()
 
@@ -120,19 +302,27 @@ class GenerateTimeTable:
             self.repeat_quota = [daily_rep for _ in range(self.course_count)]
         elif isinstance(daily_rep[0],
                         int) and len(daily_rep) == self.course_count:
-            self.repeat_quota = daily_rep
+            self.repeat_quota = list(daily_rep)
         else:
             raise ValueError("Invalid data supplied for daily repetitions.")
 
-        self.repeat_quota = [
-            self.repeat_quota[:] for _ in range(self.class_count)
-        ]
+        if self.storage == "lists":
+            self.repeat_quota = [
+                self.repeat_quota[:] for _ in range(self.class_count)
+            ]
+        else:
+            # Every class starts with (and resolve() keeps) the same limits, so
+            # the compact storages share one row.
+            self.repeat_quota = [list(self.repeat_quota)] * self.class_count
 
-        if isinstance(teachers, int):
+        if self.resources is not None and self.resources.teachers.entities:
+            self.teacher_quota = self.resources.teacher_counts(self.course_count)
+        elif isinstance(teachers, int):
             self.teacher_quota = [teachers] * self.course_count
         elif isinstance(teachers[0],
                         int) and len(teachers) == self.course_count:
-            self.teacher_quota = teachers
+            # A copy, so resolve() does not change the caller's list.
+            self.teacher_quota = list(teachers)
         else:
             raise ValueError("Invalid data supplied for teachers.")
 
@@ -155,69 +345,94 @@ class GenerateTimeTable:
 
             extra_slots = (q_max + 1) * self.course_count - self.total_slots
 
-            n = randint(1, self.course_count - extra_slots)
+            n = self.rng.randint(1, self.course_count - extra_slots)
             for i in range(extra_slots):
                 self.course_quota[n + i] -= 1
 
-        self.course_quota = [
-            self.course_quota[:] for _ in range(self.class_count)
-        ]
+        if self.storage == "lists":
+            self.course_quota = [
+                self.course_quota[:] for _ in range(self.class_count)
+            ]
+        else:
+            from genetictabler.storage import Grid
+
+            quota = Grid.zeros("h", (self.class_count, self.course_count))
+            quota.flat()[:] = array("h", self.course_quota * self.class_count)
+            self.course_quota = quota
 
     def encode_class(self):
         """
-        The encode_class() function generates random binary strings whose integer
-            values represent a course/module/subject
-
-        Left padding of random binary strings with 0 is done to ensure each string is
-            of same consistent length.
+        The encode_class() function generates a random integer code that represents
+            a class.
         """
-        class_code = bin(randint(1, self.class_count))[2:]
-        class_code = "0" * (self.class_bits - len(class_code)) + class_code
-        return class_code
+        return self.rng.randint(1, self.class_count)
 
     def encode_slot(self):
         """
-        The encode_slot() function generates random binary strings whose integer
-            values represent slot number for a day.
+        The encode_slot() function generates a random integer code that represents
+            the cumulative slot number of the week.
         """
-        slot_code = bin(randint(1, self.total_slots))[2:]
-        slot_code = "0" * (self.slot_bits - len(slot_code)) + slot_code
-        return slot_code
+        return self.rng.randint(1, self.total_slots)
 
     def encode_course(self):
         """
-        The encode_slot() function generates random binary strings whose integer
-            values represents a course/module/subject.
+        The encode_course() function generates a random integer code that represents
+            a course/module/subject.
+        """
+        return self.rng.randint(1, self.course_count)
+
+    def pack_gene(self, course_code, slot_code, class_code):
+        """
+        Packs course, slot and class codes into a single int gene, with the course
+            in the most significant bits and the class in the least significant.
         """
-        course_code = bin(randint(1, self.course_count))[2:]
-        course_code = "0" * (self.course_bits - len(course_code)) + course_code
-        return course_code
+        return ((course_code << (self.slot_bits + self.class_bits))
+                | (slot_code << self.class_bits)
+                | class_code)
+
+    def unpack_gene(self, gene):
+        """
+        Splits a gene back into its (course_code, slot_code, class_code) fields.
+        """
+        return (
+            gene >> (self.slot_bits + self.class_bits),
+            (gene & self.slot_mask) >> self.class_bits,
+            gene & self.class_mask,
+        )
+
+    def gene_to_str(self, gene):
+        """
+        Returns the binary string view of a gene, padded to gene_bits. It is only
+            meant for debugging; the algorithm itself works on the packed int.
+
+        Example:
+            >>> obj = GenerateTimeTable(classes=4, courses=4, slots=7, days=5)
+            >>> obj.initialize_genotype(4, 4, 7, 5, 2, 1)
+            [3, 6, 140]
+            >>> obj.gene_to_str(obj.pack_gene(3, 9, 2))
+            '011001001010'
+        """
+        return format(gene, "0{}b".format(self.gene_bits))
 
     def generate_gene(self):
         """
         Generates a gene by encoding the course, class, and slot codes and
-            concatenating them.
+            packing them into one int.
 
         Returns:
-            str: The generated gene.
-
-        Example:
-            >>> obj = ClassName()
-            >>> obj.generate_gene()
-            'ENGL101M01'
+            int: The generated gene.
         """
         course_code = self.encode_course()
         class_code = self.encode_class()
         slot_code = self.encode_slot()
-        return course_code + slot_code + class_code
+        return self.pack_gene(course_code, slot_code, class_code)
 
     def extract_slot_day(self, gene):
         """
         The class_slot is a cumulative class slot number, we calculate day number
             and slot number for that day for a gene using this class_slot number.
         """
-        class_slot = int(
-            gene[self.course_bits:self.course_bits + self.slot_bits], 2)
+        class_slot = (gene & self.slot_mask) >> self.class_bits
         slot_no = class_slot % self.slot_count
         day_no = class_slot // self.slot_count
 
@@ -236,59 +451,213 @@ class GenerateTimeTable:
             class, fitness_score of that gene is reduced.
         3)   If a course is occurring more han a fixed number of times, the
             fitness_score of that gene is reduced.
+
+        The per-day and per-slot course counts come from day_course_count and
+        slot_course_count, which fit_slot() keeps up to date, so scoring a gene
+        does not depend on the number of classes.
         """
         fitness_score = 100
-        course = int(gene[0:self.course_bits], 2)
+        course = gene >> (self.slot_bits + self.class_bits)
 
         slot_no, day_no = self.extract_slot_day(gene)
-        class_no = int(gene[self.course_bits + self.slot_bits:], 2)
+        class_no = gene & self.class_mask
 
-        if self.tables[class_no - 1][day_no - 1][slot_no - 1] != 0:
+        day = self.tables[class_no - 1][day_no - 1]
+        same_course = self.slot_course_count[day_no - 1][slot_no - 1][course]
+        day_repeats = self.day_course_count[class_no - 1][day_no - 1][course]
+
+        if day[slot_no - 1] != 0:
             fitness_score *= 0.01
 
-        for i in range(self.class_count):
-            if self.tables[i][day_no - 1][slot_no - 1] == course:
-                fitness_score *= 0.6
+        for _ in range(same_course):
+            fitness_score *= 0.6
 
-        if (slot_no != 1 and self.tables[class_no - 1][day_no - 1][slot_no - 2]
-                == course):
+        if slot_no != 1 and day[slot_no - 2] == course:
             fitness_score *= 0.6
 
-        if (slot_no != self.slot_count
-                and self.tables[class_no - 1][day_no - 1][slot_no] == course):
+        if slot_no != self.slot_count and day[slot_no] == course:
             fitness_score *= 0.6
 
         if self.course_quota[class_no - 1][course - 1] < 1:
             fitness_score *= 0.01
 
-        if self.tables[class_no - 1][day_no - 1].count(course) >= 2:
+        if day_repeats >= 2:
             fitness_score *= 0.01
 
-        if (self.tables[class_no - 1][day_no - 1].count(course) >=
-                self.repeat_quota[class_no - 1][course - 1]):
+        if day_repeats >= self.repeat_quota[class_no - 1][course - 1]:
             fitness_score *= 0.5
 
-        temp_counter = 0
-        for i in range(self.class_count):
-            if self.tables[i][day_no - 1][slot_no - 1] == course:
-                temp_counter += 1
-        if temp_counter == self.teacher_quota[course - 1]:
+        if self.resources is not None:
+            if not self.resources.can_host(course, day_no - 1, slot_no - 1):
+                fitness_score *= 0.01
+        elif same_course == self.teacher_quota[course - 1]:
             fitness_score *= 0.01
         return fitness_score
 
+    def cached_fitness(self, gene):
+        """
+        Returns calculate_fitness(gene), memoised on the packed gene. The fitness of
+            a gene only depends on self.tables and the quotas, so the memo stays
+            valid until fit_slot() places the next course and clears it.
+        """
+        score = self.fitness_cache.get(gene)
+        if score is None:
+            score = self.calculate_fitness(gene)
+            self.fitness_cache[gene] = score
+        return score
+
+    def calculate_population_fitness(self, population):
+        """
+        Vectorised counterpart of calculate_fitness(). The whole population is
+            decoded into NumPy arrays and every penalty is applied in one pass
+            against table_array, a (classes, days, slots) mirror of self.tables.
+
+        The penalties are multiplied in the same order as calculate_fitness(), so
+        the scores are identical to scoring each gene on its own. Course counts are
+        gathered from the day_course_count and slot_course_count arrays rather
+        than recounted from the tables.
+
+        Args:
+            population (list): A list of packed genes.
+
+        Returns:
+            List[float]: The fitness score of each gene, in population order.
+        """
+        import numpy as np
+
+        genes = np.asarray(population, dtype=np.int64)
+        course = genes >> (self.slot_bits + self.class_bits)
+        class_slot = (genes & self.slot_mask) >> self.class_bits
+        class_idx = (genes & self.class_mask) - 1
+
+        slot_idx = class_slot % self.slot_count - 1
+        day_idx = class_slot // self.slot_count - 1
+        wrapped = slot_idx < 0
+        slot_idx[wrapped] = self.slot_count - 1
+        day_idx[wrapped] -= 1
+        day_idx %= self.day_count
+
+        course_idx = course - 1
+        day_row = self.table_array[class_idx, day_idx]
+        same_course = self.slot_course_count[day_idx, slot_idx, course]
+        day_repeats = self.day_course_count[class_idx, day_idx, course]
+        rows = np.arange(len(genes))
+        left = day_row[rows, np.maximum(slot_idx - 1, 0)] == course
+        right = day_row[rows, np.minimum(slot_idx + 1, self.slot_count - 1)] == course
+
+        fitness_score = np.full(len(genes), 100.0)
+        fitness_score[day_row[rows, slot_idx] != 0] *= 0.01
+        for i in range(int(same_course.max(initial=0))):
+            fitness_score[same_course > i] *= 0.6
+        fitness_score[(slot_idx != 0) & left] *= 0.6
+        fitness_score[(slot_idx != self.slot_count - 1) & right] *= 0.6
+        fitness_score[self.course_quota_array[class_idx, course_idx] < 1] *= 0.01
+        fitness_score[day_repeats >= 2] *= 0.01
+        fitness_score[
+            day_repeats >= self.repeat_quota_array[class_idx, course_idx]] *= 0.5
+        if self.hostable_array is not None:
+            fitness_score[~self.hostable_array[day_idx, slot_idx, course]] *= 0.01
+        else:
+            fitness_score[
+                same_course == self.teacher_quota_array[course_idx]] *= 0.01
+        return fitness_score.tolist()
+
+    def population_fitness(self, population):
+        """
+        Scores a whole population, either in one vectorised pass or gene by gene
+            through the fitness memo, depending on self.vectorized.
+        """
+        if self.vectorized:
+            return self.calculate_population_fitness(population)
+        return [self.cached_fitness(gene) for gene in population]
+
     def generate_table_skeleton(self):
         """
         This function returns a 3d array with 0 value for all positions. We use this
             array to store the schedules and the timetables.
+
+        The course counters kept by fit_slot() are reset here too:
+        day_course_count[class][day][course] and slot_course_count[day][slot][course]
+        count how often a course appears in a class's day and across classes in a
+        slot (course 0 is the empty cell and is never counted). free_cells lists
+        the cells that hold no course yet, as class_idx * total_slots + day_idx *
+        slot_count + slot_idx, and free_cell_index gives each cell's position in
+        it so fit_cell() can remove a cell in O(1). With vectorized=True these
+        counters are NumPy arrays, and mirrors of the tables and quotas used by
+        calculate_population_fitness() are built as well.
+        The "compact" and "shared" storages build Grids and arrays instead of
+        nested lists (see the storage argument). With resources, every teacher
+        and room assignment is cleared, and vectorized runs get
+        hostable_array[day, slot, course], which says whether a qualified
+        teacher and room are free.
         """
-        for _ in range(self.class_count):
-            class_table = []
-            for _ in range(self.day_count):
-                day = [0 for _ in range(self.slot_count)]
-                class_table.append(day)
-            self.tables.append(class_table)
+        if self.storage == "lists":
+            self.tables = []
+            for _ in range(self.class_count):
+                class_table = []
+                for _ in range(self.day_count):
+                    day = [0 for _ in range(self.slot_count)]
+                    class_table.append(day)
+                self.tables.append(class_table)
+
+            self.day_course_count = [[[0] * (self.course_count + 1)
+                                      for _ in range(self.day_count)]
+                                     for _ in range(self.class_count)]
+            self.free_cells = list(range(self.class_count * self.total_slots))
+            self.free_cell_index = list(self.free_cells)
+        else:
+            from genetictabler.storage import Grid
+
+            self.tables = Grid.zeros(
+                "H", (self.class_count, self.day_count, self.slot_count),
+                shared=self.storage == "shared")
+            self.day_course_count = Grid.zeros(
+                "H", (self.class_count, self.day_count, self.course_count + 1))
+            self.free_cells = array(
+                "I", range(self.class_count * self.total_slots))
+            self.free_cell_index = array("I", self.free_cells)
+        self.slot_course_count = [[[0] * (self.course_count + 1)
+                                   for _ in range(self.slot_count)]
+                                  for _ in range(self.day_count)]
+        self.filled_slots = 0
+        self.fitness_cache.clear()
+        if self.resources is not None:
+            self.resources.bind(self.day_count, self.slot_count,
+                                self.class_count, self.course_count)
+
+        if self.vectorized:
+            import numpy as np
+
+            self.day_course_count = np.array(self.day_course_count,
+                                             dtype=np.int64)
+            self.slot_course_count = np.array(self.slot_course_count,
+                                              dtype=np.int64)
+            self.table_array = np.array(self.tables, dtype=np.int64)
+            self.course_quota_array = np.array(self.course_quota,
+                                               dtype=np.int64)
+            self.repeat_quota_array = np.array(self.repeat_quota,
+                                               dtype=np.int64)
+            self.teacher_quota_array = np.array(self.teacher_quota,
+                                                dtype=np.int64)
+            if self.resources is not None:
+                self.hostable_array = np.zeros(
+                    (self.day_count, self.slot_count, self.course_count + 1),
+                    dtype=bool)
+                for day_idx in range(self.day_count):
+                    for slot_idx in range(self.slot_count):
+                        self.update_hostable(day_idx, slot_idx)
         return self.tables
 
+    def update_hostable(self, day_idx, slot_idx):
+        """
+        Refreshes the hostable_array row of a (day, slot) after its resources
+            changed.
+        """
+        self.hostable_array[day_idx, slot_idx, 1:] = [
+            self.resources.can_host(course, day_idx, slot_idx)
+            for course in range(1, self.course_count + 1)
+        ]
+
     def fit_slot(self, gene):
         """
         The fit_slot() function fills the tables array with fit course schedules that
@@ -297,58 +666,191 @@ class GenerateTimeTable:
         Python list indexing starts from 0, hence we subtract 1 from class_no, day_no,
         slot_no which are natural numbers.
         """
-        course = int(gene[0:self.course_bits], 2)
+        course = gene >> (self.slot_bits + self.class_bits)
 
         slot_no, day_no = self.extract_slot_day(gene)
-        class_no = int(gene[self.course_bits + self.slot_bits:], 2)
+        class_no = gene & self.class_mask
 
-        self.tables[class_no - 1][day_no - 1][slot_no - 1] = course
-        self.course_quota[class_no - 1][course - 1] -= 1
+        self.fit_cell(class_no - 1, day_no - 1, slot_no - 1, course)
 
-    def generate_population(self, size):
+    def fit_cell(self, class_idx, day_idx, slot_idx, course):
+        """
+        Places a course in one cell of the tables, taking 0-based indexes.
+
+        The course counters and filled_slots are updated in place, taking the
+        course being replaced (if any) out of the counts first and giving it
+        back its course_quota, as clear_cell() does. The quotas therefore only
+        depend on the courses the tables hold, so load_tables() rebuilds them
+        exactly. With resources, the replaced course's teacher and room are
+        released and the new course is assigned its own.
+        """
+        previous = self.tables[class_idx][day_idx][slot_idx]
+        if previous:
+            self.day_course_count[class_idx][day_idx][previous] -= 1
+            self.slot_course_count[day_idx][slot_idx][previous] -= 1
+            self.course_quota[class_idx][previous - 1] += 1
+            if self.table_array is not None:
+                self.course_quota_array[class_idx, previous - 1] += 1
+            if self.resources is not None:
+                self.resources.release(class_idx, day_idx, slot_idx)
+        else:
+            self.filled_slots += 1
+            self.take_free_cell(class_idx * self.total_slots +
+                                day_idx % self.day_count * self.slot_count +
+                                slot_idx)
+        self.day_course_count[class_idx][day_idx][course] += 1
+        self.slot_course_count[day_idx][slot_idx][course] += 1
+
+        self.tables[class_idx][day_idx][slot_idx] = course
+        self.course_quota[class_idx][course - 1] -= 1
+        self.fitness_cache.clear()
+
+        if self.resources is not None:
+            self.resources.assign(class_idx, day_idx, slot_idx, course)
+        if self.table_array is not None:
+            self.table_array[class_idx, day_idx, slot_idx] = course
+            self.course_quota_array[class_idx, course - 1] -= 1
+            if self.hostable_array is not None:
+                self.update_hostable(day_idx, slot_idx)
+
+    def clear_cell(self, class_idx, day_idx, slot_idx):
+        """
+        Empties one cell of the tables, taking 0-based indexes. It is the inverse
+            of fit_cell(): the course goes back into the class's course_quota and
+            out of the counters, and the cell becomes free again.
+        """
+        course = self.tables[class_idx][day_idx][slot_idx]
+        if not course:
+            return
+        self.day_course_count[class_idx][day_idx][course] -= 1
+        self.slot_course_count[day_idx][slot_idx][course] -= 1
+        self.filled_slots -= 1
+        cell = (class_idx * self.total_slots +
+                day_idx % self.day_count * self.slot_count + slot_idx)
+        self.free_cell_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+        self.tables[class_idx][day_idx][slot_idx] = 0
+        self.course_quota[class_idx][course - 1] += 1
+        self.fitness_cache.clear()
+
+        if self.resources is not None:
+            self.resources.release(class_idx, day_idx, slot_idx)
+        if self.table_array is not None:
+            self.table_array[class_idx, day_idx, slot_idx] = 0
+            self.course_quota_array[class_idx, course - 1] += 1
+            if self.hostable_array is not None:
+                self.update_hostable(day_idx, slot_idx)
+
+    def take_free_cell(self, cell):
+        """
+        Removes a cell from free_cells by moving the last free cell into its
+            place.
         """
-        Generates a population of genes by repeatedly calling the `generate_gene`
-           method.
+        position = self.free_cell_index[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[position] = last
+            self.free_cell_index[last] = position
+
+    def encode_cell(self, cell):
+        """
+        Returns the (class_code, slot_code) of a cell numbered as in free_cells,
+            so that extract_slot_day() maps slot_code back to the cell's day and
+            slot.
+        """
+        class_idx, day_slot = divmod(cell, self.total_slots)
+        day_idx, slot_idx = divmod(day_slot, self.slot_count)
+        # extract_slot_day() reads a slot code in day d as day d - 1.
+        slot_code = ((day_idx + 1) % self.day_count * self.slot_count +
+                     slot_idx + 1)
+        return class_idx + 1, slot_code
+
+    def open_courses(self, class_idx):
+        """
+        Returns the courses that a class still has weekly quota for.
+        """
+        return [
+            course
+            for course, quota in enumerate(self.course_quota[class_idx], start=1)
+            if quota > 0
+        ]
+
+    def generate_constructive_gene(self):
+        """
+        Generates a gene for a random free cell, with a random course the cell's
+            class still has quota for. Falls back to generate_gene() when every
+            cell is filled.
+        """
+        if not self.free_cells:
+            return self.generate_gene()
+        class_code, slot_code = self.encode_cell(self.rng.choice(
+            self.free_cells))
+        courses = self.open_courses(class_code - 1)
+        course_code = self.rng.choice(courses) if courses else self.encode_course()
+        return self.pack_gene(course_code, slot_code, class_code)
+
+    def generate_greedy_population(self, size):
+        """
+        Builds a population from the best placements still available: every free
+            cell is paired with every course its class has quota for, and the
+            `size` best-scoring genes are kept. If there are fewer candidates, the
+            rest of the population repeats the best ones.
+        """
+        candidates = []
+        for cell in self.free_cells:
+            class_code, slot_code = self.encode_cell(cell)
+            for course in self.open_courses(class_code - 1) or range(
+                    1, self.course_count + 1):
+                candidates.append(
+                    self.pack_gene(course, slot_code, class_code))
+        if not candidates:
+            return [self.generate_gene() for _ in range(size)]
+
+        scores = self.population_fitness(candidates)
+        order = sorted(range(len(candidates)),
+                       key=scores.__getitem__,
+                       reverse=True)[:size]
+        population = [candidates[i] for i in order]
+        return (population * (size // len(population) + 1))[:size]
+
+    def generate_population(self, size, seeding=None):
+        """
+        Generates a population of genes according to self.seeding. "random" calls
+            generate_gene() for every gene. "constructive" calls
+            generate_constructive_gene(), or generate_greedy_population() once no
+            more free cells are left than the population size.
 
         Args:
             size (int): The desired size of the population.
+            seeding (str): Overrides self.seeding for this population.
 
         Returns:
-            List[str]: A list of generated genes.
-
-        Example:
-            >>> obj = ClassName()
-            >>> obj.generate_population(3)
-            ['ENGL101M01', 'MATH102T05', 'PHYS201W03']
+            List[int]: A list of generated genes.
         """
+        if (seeding or self.seeding) == "constructive":
+            if len(self.free_cells) <= size:
+                return self.generate_greedy_population(size)
+            return [self.generate_constructive_gene() for _ in range(size)]
         return [self.generate_gene() for _ in range(size)]
 
     def single_point_crossover(self, gene_a, gene_b):
         """
         For crossover, we randomly choose one out of course_code, slot_code and
-            class_code to swap between the genes.
+            class_code to swap between the genes. The swap is done with the field
+            masks, so no string slicing or re-parsing is needed.
         """
-        c = choice([1, 2, 3])
+        c = self.rng.choice([1, 2, 3])
 
         if c == 1:
-            gene_c = gene_b[0:self.course_bits] + gene_a[self.course_bits:]
-            gene_d = gene_a[0:self.course_bits] + gene_b[self.course_bits:]
-
+            mask = self.course_mask
         elif c == 2:
-            gene_c = (
-                gene_a[:self.course_bits] +
-                gene_b[self.course_bits:self.course_bits + self.slot_bits] +
-                gene_a[self.course_bits + self.slot_bits:])
-            gene_d = (
-                gene_b[:self.course_bits] +
-                gene_a[self.course_bits:self.course_bits + self.slot_bits] +
-                gene_b[self.course_bits + self.slot_bits:])
-
+            mask = self.slot_mask
         else:
-            gene_c = (gene_a[:self.course_bits + self.slot_bits] +
-                      gene_b[self.course_bits + self.slot_bits:])
-            gene_d = (gene_b[:self.course_bits + self.slot_bits] +
-                      gene_a[self.course_bits + self.slot_bits:])
+            mask = self.class_mask
+
+        gene_c = (gene_a & ~mask) | (gene_b & mask)
+        gene_d = (gene_b & ~mask) | (gene_a & mask)
         return [gene_c, gene_d]
 
     def multi_point_crossover(self, gene_a, gene_b, points):
@@ -356,20 +858,13 @@ class GenerateTimeTable:
         Performs multi-point crossover on two input genes.
 
         Args:
-            gene_a (str): The first gene to be crossed over.
-            gene_b (str): The second gene to be crossed over.
+            gene_a (int): The first gene to be crossed over.
+            gene_b (int): The second gene to be crossed over.
             points (int): The number of crossover points to use.
 
         Returns:
-            List[str]: A list containing the two offspring genes generated by
+            List[int]: A list containing the two offspring genes generated by
             multi-point crossover.
-
-        Example:
-            >>> obj = ClassName()
-            >>> gene_a = 'ENGL101M01'
-            >>> gene_b = 'MATH102T05'
-            >>> obj.multi_point_crossover(gene_a, gene_b, 2)
-            ['ENGL102T05', 'MATH101M01']
         """
         for _ in range(points):
             gene_a, gene_b = self.single_point_crossover(gene_a, gene_b)
@@ -382,44 +877,49 @@ class GenerateTimeTable:
             random code of the same type.
 
         Parameters:
-        gene (str): The gene to be mutated.
+        gene (int): The gene to be mutated.
         course_bit_length (int): The length of the course code in bits.
         slot_bit_length (int): The length of the slot code in bits.
 
         Returns:
-        str: The mutated gene.
+        int: The mutated gene.
         """
-        c = choice([1, 2, 3])
+        c = self.rng.choice([1, 2, 3])
 
         if c == 1:
             random_course = self.encode_course()
-            mutated_gene = random_course + gene[course_bit_length:]
+            mutated_gene = (gene & ~self.course_mask) | (
+                random_course << (slot_bit_length + self.class_bits))
 
         elif c == 2:
             random_slot = self.encode_slot()
-            mutated_gene = (gene[:course_bit_length] + random_slot +
-                            gene[course_bit_length + slot_bit_length:])
+            mutated_gene = (gene & ~self.slot_mask) | (random_slot <<
+                                                       self.class_bits)
         else:
             random_class = self.encode_class()
-            mutated_gene = gene[:course_bit_length +
-                                slot_bit_length] + random_class
+            mutated_gene = (gene & ~self.class_mask) | random_class
 
         return mutated_gene
 
-    def selection_pair(self, population):
+    def selection_pair(self, population, cum_weights=None):
         """
         Selects two individuals from the population, based on the fitness of each
             individual.
 
         Args:
             population (list): A list of individuals.
+            cum_weights (list): Optional cumulative fitness of the population, as
+                built once per generation by run_evolution(). With it each draw
+                is a binary search instead of a pass over the population.
 
         Returns:
             A list of two individuals selected from the population.
         """
-        return choices(
+        if cum_weights is None:
+            cum_weights = list(accumulate(map(self.cached_fitness, population)))
+        return self.rng.choices(
             population=population,
-            weights=[self.calculate_fitness(gene) for gene in population],
+            cum_weights=cum_weights,
             k=2,
         )
 
@@ -434,7 +934,88 @@ class GenerateTimeTable:
         Returns:
             The sorted population.
         """
-        return sorted(population, key=self.calculate_fitness, reverse=True)
+        return sorted(population, key=self.cached_fitness, reverse=True)
+
+    def start_budget(self):
+        """
+        Starts the time_budget and max_evaluations of a run() or resolve().
+        """
+        self.deadline = (None if self.time_budget is None else perf_counter() +
+                         self.time_budget)
+        self.evaluations = 0
+
+    def budget_exhausted(self):
+        """
+        Returns True once the time_budget or max_evaluations started by
+            start_budget() is used up.
+        """
+        if self.deadline is not None and perf_counter() >= self.deadline:
+            return True
+        return (self.max_evaluations is not None
+                and self.evaluations >= self.max_evaluations)
+
+    def report_progress(self, best_fitness, cells_placed=None):
+        """
+        Sends the progress of the current run to progress_callback, if one is
+            set: cells_placed (defaults to the filled cells), total_cells and
+            best_fitness. The "cell" mode reports after every placed cell with the
+            fitness of its gene, the "timetable" mode after every generation (or
+            island epoch) with the best timetable fitness, and the "backtracking"
+            mode after every assignment with a best_fitness of None.
+        """
+        if self.progress_callback is None:
+            return
+        self.progress_callback({
+            "cells_placed":
+            self.filled_slots if cells_placed is None else cells_placed,
+            "total_cells": self.class_count * self.total_slots,
+            "best_fitness": best_fitness,
+        })
+
+    def check_convergence(self, population, best_fitness, state, key=None):
+        """
+        Updates the convergence state of a GA run after a generation was scored.
+
+        The run has converged once its best fitness has not improved for
+        self.patience generations. When the share of distinct individuals drops
+        below self.min_diversity, state["mutation_rounds"] grows by one (up to
+        two above self.mutation_rounds) for the next generation, and it falls
+        back to self.mutation_rounds once the population is diverse again.
+
+        Args:
+            population (list): The scored generation.
+            best_fitness (int): Its best fitness.
+            state (dict): The run's "best", "stale" and "mutation_rounds", updated
+                in place.
+            key (callable): Makes individuals hashable for the diversity count.
+
+        Returns:
+            bool: True if the run has converged and should stop.
+        """
+        if state["best"] is None or best_fitness > state["best"]:
+            state["best"] = best_fitness
+            state["stale"] = 0
+        else:
+            state["stale"] += 1
+
+        if self.min_diversity:
+            if self.diversity(population, key) < self.min_diversity:
+                state["mutation_rounds"] = min(state["mutation_rounds"] + 1,
+                                               self.mutation_rounds + 2)
+            else:
+                state["mutation_rounds"] = self.mutation_rounds
+
+        return self.patience is not None and state["stale"] >= self.patience
+
+    def diversity(self, population, key=None):
+        """
+        Returns the share of distinct individuals in a population, from 1/size
+            (all identical) to 1.0.
+        """
+        if key is not None:
+            population = map(key, population)
+        population = list(population)
+        return len(set(population)) / len(population)
 
     def run_evolution(
         self,
@@ -443,51 +1024,550 @@ class GenerateTimeTable:
         population_size,
         max_fitness,
         max_generations,
+        seeding=None,
     ):
         """
         Runs the evolutionary algorithm to generate the schedule.
 
+        Each generation is bred in three batched phases (selection of all parent
+        pairs, their crossover, then mutation of all children), so the time spent
+        in each phase can be measured with a handful of clock reads per
+        generation.
+
+        Besides reaching max_fitness, the run stops early once it has converged
+        (see check_convergence()) or the run's budget is exhausted (see
+        budget_exhausted()), returning the best gene found so far.
+
+        With a metrics_callback set, an "evolution" event is reported with
+        generations, evaluations (genes scored), best_fitness and mean_fitness of
+        the last scored generation, early_exit (True if max_fitness was reached
+        before max_generations ran out), converged (True if the run stopped
+        because its best fitness stagnated), diversity (the share of distinct
+        genes in the last generation) and the seconds spent in evaluation,
+        selection, crossover and mutation.
+
         Args:
             course_bit_length (int): The length of the course bit string.
             slot_bit_length (int): The length of the slot bit string.
             population_size (int): The size of the population.
             max_fitness (int): The maximum fitness value to be achieved.
             max_generations (int): The maximum number of generations to be run.
+            seeding (str): Overrides self.seeding for the initial population.
 
         Returns:
             The best individual generated by the algorithm.
         """
-        population = self.generate_population(population_size)
+        timings = [0.0, 0.0, 0.0, 0.0]
+        generations = 0
+        early_exit = False
+        converged = False
+        state = {
+            "best": None,
+            "stale": 0,
+            "mutation_rounds": self.mutation_rounds
+        }
+
+        population = self.generate_population(population_size, seeding)
         for _ in range(max_generations):
+            started = perf_counter()
+            scores = self.population_fitness(population)
+            order = sorted(range(len(population)),
+                           key=scores.__getitem__,
+                           reverse=True)
+            population = [population[i] for i in order]
+            cum_weights = list(accumulate(scores[i] for i in order))
+            generations += 1
+            self.evaluations += len(population)
+            evaluated = perf_counter()
+            timings[0] += evaluated - started
+
+            if scores[order[0]] >= max_fitness:
+                early_exit = True
+                break
+            if self.check_convergence(population, scores[order[0]], state):
+                converged = True
+                break
+            if self.budget_exhausted():
+                break
+
+            parents = [
+                self.selection_pair(population, cum_weights)
+                for _ in range(len(population) // 2 - 1)
+            ]
+            selected = perf_counter()
+            if self.crossover_points == 1:
+                children = [
+                    self.single_point_crossover(gene_a, gene_b)
+                    for gene_a, gene_b in parents
+                ]
+            else:
+                children = [
+                    self.multi_point_crossover(gene_a, gene_b,
+                                               self.crossover_points)
+                    for gene_a, gene_b in parents
+                ]
+            crossed = perf_counter()
+            mutants = [
+                self.mutation(child, course_bit_length, slot_bit_length)
+                for pair in children for child in pair
+            ]
+            for _ in range(state["mutation_rounds"] - 1):
+                mutants = [
+                    self.mutation(child, course_bit_length, slot_bit_length)
+                    for child in mutants
+                ]
+            next_generation = population[0:2] + mutants
+            mutated = perf_counter()
+
+            timings[1] += selected - evaluated
+            timings[2] += crossed - selected
+            timings[3] += mutated - crossed
+            population = next_generation
+
+        if self.metrics_callback is not None and generations:
+            self.report_evolution(generations, population_size, scores,
+                                  early_exit, timings, converged,
+                                  self.diversity(population))
+        return population[0]
+
+    def report_evolution(self, generations, population_size, scores,
+                         early_exit, timings, converged=False, diversity=None):
+        """
+        Sends the "evolution" metrics of one GA run to metrics_callback and adds
+            them to the totals of the current run().
+        """
+        metrics = {
+            "generations": generations,
+            "evaluations": generations * population_size,
+            "best_fitness": max(scores),
+            "mean_fitness": sum(scores) / len(scores),
+            "early_exit": early_exit,
+            "converged": converged,
+            "diversity": diversity,
+            "evaluation_time": timings[0],
+            "selection_time": timings[1],
+            "crossover_time": timings[2],
+            "mutation_time": timings[3],
+        }
+        if self.run_metrics is not None:
+            self.run_metrics["evolutions"] += 1
+            self.run_metrics["generations"] += generations
+            self.run_metrics["evaluations"] += metrics["evaluations"]
+            self.run_metrics["early_exits"] += early_exit
+            self.run_metrics["converged"] += converged
+        self.metrics_callback("evolution", metrics)
+
+    def generate_timetable(self):
+        """
+        Generates a complete timetable individual for the "timetable" mode.
+
+        An individual is a list with one row per class, each row holding the
+        courses of all total_slots cells of the week (cell day * slot_count + slot).
+        Every row is a shuffle of the courses the class still has to take according
+        to course_quota, so the weekly course quota holds by construction.
+        """
+        timetable = []
+        for class_quota in self.course_quota:
+            row = [
+                course for course, quota in enumerate(class_quota, start=1)
+                for _ in range(max(quota, 0))
+            ]
+            row = (row + [0] * self.total_slots)[:self.total_slots]
+            self.rng.shuffle(row)
+            timetable.append(row)
+        return timetable
+
+    def timetable_violations(self, timetable):
+        """
+        Counts the rule violations in a complete timetable individual -
+        1)   Every pair of adjacent slots in a day holding the same course.
+        2)   Every occurrence of a course in a day beyond its repeat_quota.
+        3)   Every class holding a course in a slot beyond the course's
+            teacher_quota, or with resources, every course of a slot left
+            without a teacher or room when they are assigned as fit_timetable()
+            does (see Resources.column_clashes()), so availability, room
+            capacity and shared qualifications count too.
+        """
+        violations = 0
+        slot_count = self.slot_count
+
+        for class_no, row in enumerate(timetable):
+            repeat_quota = self.repeat_quota[class_no]
+            for start in range(0, self.total_slots, slot_count):
+                day = row[start:start + slot_count]
+                violations += sum(
+                    1 for a, b in zip(day, day[1:]) if a and a == b)
+                for course, count in Counter(day).items():
+                    if course and count > repeat_quota[course - 1]:
+                        violations += count - repeat_quota[course - 1]
+
+        if self.resources is not None:
+            # A timetable cell is numbered like a Resources time.
+            for time, column in enumerate(zip(*timetable)):
+                violations += self.resources.column_clashes(column, time)
+            return violations
+
+        for column in zip(*timetable):
+            for course, count in Counter(column).items():
+                if course and count > self.teacher_quota[course - 1]:
+                    violations += count - self.teacher_quota[course - 1]
+        return violations
+
+    def violation_report(self, tables=None):
+        """
+        Counts the rule violations of a solved timetable, rule by rule.
+
+        Args:
+            tables (list): A timetable in the self.tables layout. Defaults to
+                self.tables, in which case weekly course quota overruns (negative
+                entries left in course_quota) are counted as well.
+
+        Returns:
+            dict: The number of "empty" cells, "adjacent" repeats, "repeat" quota
+                overruns, "teacher" clashes, "room" clashes and weekly "course"
+                quota overruns, plus their "total". With resources, the clashes of
+                self.tables are the placed cells left without a teacher or room;
+                otherwise "teacher" counts classes beyond teacher_quota in a slot
+                and "room" is 0.
+        """
+        report = dict.fromkeys(
+            ("empty", "adjacent", "repeat", "teacher", "room", "course"), 0)
+        audited = tables is None and self.resources is not None
+        if tables is None:
+            tables = self.tables
+            report["course"] = sum(-quota for class_quota in self.course_quota
+                                   for quota in class_quota if quota < 0)
+        if audited:
+            report["teacher"], report["room"] = self.resources.clashes(tables)
+
+        for class_no, class_table in enumerate(tables):
+            for day in class_table:
+                report["empty"] += sum(1 for course in day if not course)
+                report["adjacent"] += sum(
+                    1 for a, b in zip(day, day[1:]) if a and a == b)
+                for course, count in Counter(day).items():
+                    if course and count > self.repeat_quota[class_no][course - 1]:
+                        report["repeat"] += (count -
+                                             self.repeat_quota[class_no][course - 1])
+
+        for day_no in range(self.day_count if not audited else 0):
+            for slot_no in range(self.slot_count):
+                column = Counter(class_table[day_no][slot_no]
+                                 for class_table in tables)
+                for course, count in column.items():
+                    if course and count > self.teacher_quota[course - 1]:
+                        report["teacher"] += count - self.teacher_quota[course - 1]
+
+        report["total"] = sum(report.values())
+        return report
+
+    def timetable_fitness(self, timetable):
+        """
+        Scores a complete timetable individual. A timetable without violations
+            scores max_fitness, and every violation lowers the score.
+        """
+        return self.max_fitness / (1 + self.timetable_violations(timetable))
+
+    def timetable_crossover(self, timetable_a, timetable_b):
+        """
+        For crossover, every class row of the children is taken whole from one of
+            the two parents, so both children still satisfy the course quota.
+        """
+        timetable_c, timetable_d = [], []
+        for row_a, row_b in zip(timetable_a, timetable_b):
+            if self.rng.choice([True, False]):
+                row_a, row_b = row_b, row_a
+            timetable_c.append(row_a)
+            timetable_d.append(row_b)
+        return [timetable_c, timetable_d]
+
+    def timetable_mutation(self, timetable):
+        """
+        Applies mutation to a timetable individual by swapping two cells of one
+            randomly chosen class. Rows are shared between parents and children,
+            so the mutated row is copied rather than changed in place.
+        """
+        class_no = self.rng.randint(0, self.class_count - 1)
+        i, j = self.rng.sample(range(self.total_slots), 2)
+        row = timetable[class_no][:]
+        row[i], row[j] = row[j], row[i]
+
+        mutated = timetable[:]
+        mutated[class_no] = row
+        return mutated
+
+    def evolve_timetables(self, population, max_fitness, max_generations,
+                          state=None):
+        """
+        Evolves a population of complete timetables for up to max_generations.
+            It mirrors run_evolution(): each generation is scored once, the two best
+            individuals are kept and the rest are bred by fitness-proportional
+            selection, crossover and mutation, the run stops early on convergence
+            or an exhausted budget, and the same "evolution" metrics are reported
+            when a metrics_callback is set.
+
+        Args:
+            population (list): The timetable individuals to start from.
+            max_fitness (int): The maximum fitness value to be achieved.
+            max_generations (int): The maximum number of generations to be run.
+            state (dict): The convergence state (see check_convergence()) to
+                continue from, e.g. from a checkpoint. Defaults to a new one.
+
+        Returns:
+            The final population, sorted from best to worst.
+        """
+        timings = [0.0, 0.0, 0.0, 0.0]
+        generations = 0
+        early_exit = False
+        converged = False
+        if state is None:
+            state = {
+                "best": None,
+                "stale": 0,
+                "mutation_rounds": self.mutation_rounds
+            }
+
+        for _ in range(max_generations):
+            started = perf_counter()
+            scores = [self.timetable_fitness(t) for t in population]
+            order = sorted(range(len(population)),
+                           key=scores.__getitem__,
+                           reverse=True)
+            population = [population[i] for i in order]
+            cum_weights = list(accumulate(scores[i] for i in order))
+            generations += 1
+            self.evaluations += len(population)
+            evaluated = perf_counter()
+            timings[0] += evaluated - started
+
+            self.report_progress(scores[order[0]])
+            if scores[order[0]] >= max_fitness:
+                early_exit = True
+                break
+            if self.check_convergence(population, scores[order[0]], state,
+                                      timetable_key):
+                converged = True
+                break
+            if self.budget_exhausted():
+                break
+
+            parents = [
+                self.rng.choices(population, cum_weights=cum_weights, k=2)
+                for _ in range(len(population) // 2 - 1)
+            ]
+            selected = perf_counter()
+            children = [
+                self.timetable_crossover(timetable_a, timetable_b)
+                for timetable_a, timetable_b in parents
+            ]
+            crossed = perf_counter()
+            mutants = [
+                self.timetable_mutation(child)
+                for pair in children for child in pair
+            ]
+            for _ in range(state["mutation_rounds"] - 1):
+                mutants = [self.timetable_mutation(child) for child in mutants]
+            next_generation = population[0:2] + mutants
+            mutated = perf_counter()
+
+            timings[1] += selected - evaluated
+            timings[2] += crossed - selected
+            timings[3] += mutated - crossed
+            population = next_generation
+            self.checkpoint(population=population,
+                            generations=self.generations_done + generations,
+                            convergence=state)
+        else:
             population = sorted(population,
-                                key=self.calculate_fitness,
+                                key=self.timetable_fitness,
                                 reverse=True)
 
-            if self.calculate_fitness(population[0]) >= max_fitness:
-                return population[0]
+        if self.metrics_callback is not None and generations:
+            self.report_evolution(generations, len(population), scores,
+                                  early_exit, timings, converged,
+                                  self.diversity(population, timetable_key))
+        return population
 
-            next_generation = population[0:2]
+    def run_timetable_evolution(self, population_size, max_fitness,
+                                max_generations, population=None,
+                                generations=0, convergence=None):
+        """
+        Runs the evolutionary algorithm over complete timetables, as used by the
+            "timetable" mode.
 
-            for _ in range(len(population) // 2 - 1):
-                parents = self.selection_pair(population)
-                children = self.single_point_crossover(parents[0], parents[1])
-                child_a = self.mutation(children[0], course_bit_length,
-                                        slot_bit_length)
-                child_b = self.mutation(children[1], course_bit_length,
-                                        slot_bit_length)
-                next_generation += [child_a, child_b]
+        Args:
+            population_size (int): The size of the population.
+            max_fitness (int): The maximum fitness value to be achieved.
+            max_generations (int): The maximum number of generations to be run.
+            population (list): A population to continue from, e.g. from a
+                checkpoint. Defaults to a new one.
+            generations (int): The generations that population has evolved for.
+            convergence (dict): The convergence state of that population.
 
-            population = next_generation
-        return population[0]
+        Returns:
+            The best timetable individual generated by the algorithm.
+        """
+        if population is None:
+            population = [
+                self.generate_timetable() for _ in range(population_size)
+            ]
+        self.generations_done = generations
+        return self.evolve_timetables(population, max_fitness,
+                                      max_generations - generations,
+                                      convergence)[0]
+
+    def run_island_evolution(self, population_size, max_fitness,
+                             max_generations, populations=None, generations=0):
+        """
+        Runs the "timetable" mode as an island model. Each of self.islands
+            populations evolves in a worker process for migration_interval
+            generations at a time; between these epochs the best individual of
+            every island replaces the worst individual of the next island (ring
+            topology). Every island epoch gets its own seed drawn from self.rng,
+            so the islands use independent random streams and a seeded run is
+            reproducible regardless of how the pool schedules them. Each epoch
+            gets what is left of the run's budget, and no new epoch starts once
+            it is exhausted.
+
+        Args:
+            population_size (int): The size of each island's population.
+            max_fitness (int): The maximum fitness value to be achieved.
+            max_generations (int): The maximum number of generations to be run.
+            populations (list): The island populations to continue from, e.g.
+                from a checkpoint. Defaults to new ones.
+            generations (int): The generations those populations have evolved
+                for.
+
+        Returns:
+            The best timetable individual found on any island.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = self.workers or min(self.islands, os.cpu_count() or 1)
+        if populations is None:
+            populations = [None] * self.islands
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while generations < max_generations:
+                if generations and self.budget_exhausted():
+                    break
+                epoch = min(self.migration_interval,
+                            max_generations - generations)
+                time_left = (None if self.deadline is None else
+                             max(self.deadline - perf_counter(), 0.0))
+                evaluations_left = (None if self.max_evaluations is None else
+                                    max(self.max_evaluations -
+                                        self.evaluations, 0))
+                futures = [
+                    executor.submit(
+                        _evolve_island,
+                        self,
+                        population,
+                        population_size,
+                        self.rng.randint(0, 2**32 - 1),
+                        max_fitness,
+                        epoch,
+                        time_left,
+                        evaluations_left,
+                    ) for population in populations
+                ]
+                results = [future.result() for future in futures]
+                populations = [population for population, _ in results]
+                self.evaluations += sum(count for _, count in results)
+                generations += epoch
+
+                best = [population[0] for population in populations]
+                best_fitness = max(map(self.timetable_fitness, best))
+                self.report_progress(best_fitness)
+                if best_fitness >= max_fitness:
+                    break
+                for island, migrant in enumerate(best):
+                    populations[(island + 1) % self.islands][-1] = migrant
+                self.checkpoint(population=populations,
+                                generations=generations)
+
+        return max((population[0] for population in populations),
+                   key=self.timetable_fitness)
+
+    def fit_timetable(self, timetable):
+        """
+        Copies a complete timetable individual into self.tables through fit_cell(),
+            so the counters and quotas end up as if every cell had been placed by
+            the "cell" mode.
+        """
+        for class_idx, row in enumerate(timetable):
+            for cell, course in enumerate(row):
+                if course:
+                    day_idx, slot_idx = divmod(cell, self.slot_count)
+                    self.fit_cell(class_idx, day_idx, slot_idx, course)
 
     def run(self):
         """
         Runs the scheduling algorithm.
 
+        In the "backtracking" mode the outcome of the search (whether it solved
+        every cell, timed out or hit its backtrack limit, the cells left empty,
+        and the violations left) is kept in self.solver_report.
+
+        With a cache set, a seeded run first looks its fingerprint up; on a hit
+        the stored tables are loaded with load_tables() and self.cache_hit is
+        set, and on a miss the solved tables are stored, unless the solve was
+        cut short by a budget (see cut_short()).
+
+        With a metrics_callback set, a "run" event is reported at the end with
+        the totals of the run: evolutions (GA runs), generations, evaluations,
+        early_exits, converged (GA runs stopped by patience), budget_exhausted
+        (whether time_budget or max_evaluations ran out), cells_placed (cells
+        holding a course), overwrites (genes that landed on an already filled
+        cell and replaced its course, leaving a placement to be made again) and
+        wall_time.
+
         Returns:
             The generated schedule.
         """
-        course_bit_length, slot_bit_length, all_slots = self.initialize_genotype(
+        key = None
+        self.cache_hit = False
+        if self.cache is not None:
+            from genetictabler.cache import fingerprint
+
+            key = fingerprint(self)
+            tables = self.cache.get(key) if key else None
+            if tables is not None:
+                self.load_tables(tables)
+                self.cache_hit = True
+                return self.tables
+
+        tables = self.solve()
+        if key and not self.cut_short():
+            self.cache.put(key, tables)
+        return tables
+
+    def cut_short(self):
+        """
+        Returns True if the last solve was stopped by its time_budget or
+            max_evaluations, or its backtracking search or repair stage ran out
+            of time. Such a result depends on the machine it ran on, so run()
+            does not cache it.
+        """
+        return bool(
+            self.budget_exhausted()
+            or (self.solver_report or {}).get("timed_out")
+            or (self.repair_report or {}).get("timed_out"))
+
+    def solve(self):
+        """
+        Runs the configured engine from an empty timetable; run() without the
+            cache.
+
+        Returns:
+            The generated schedule.
+        """
+        if self.seed is not None:
+            self.rng.seed(self.seed)
+        self.solver_report = None
+        self.repair_report = None
+        self.start_metrics()
+        self.initialize_genotype(
             self.courses,
             self.classes,
             self.slots,
@@ -496,135 +1576,380 @@ class GenerateTimeTable:
             self.teachers,
         )
         self.generate_table_skeleton()
+        return self.solve_from(self.class_count * self.total_slots)
+
+    def start_metrics(self):
+        """
+        Starts collecting the "run" totals, if a metrics_callback is set.
+        """
+        if self.metrics_callback is not None:
+            self.run_metrics = {
+                "evolutions": 0,
+                "generations": 0,
+                "evaluations": 0,
+                "early_exits": 0,
+                "converged": 0,
+                "budget_exhausted": False,
+                "cells_placed": 0,
+                "overwrites": 0,
+                "wall_time": perf_counter(),
+            }
+
+    def solve_from(self, all_slots, population=None, generations=0,
+                   convergence=None):
+        """
+        Runs the configured engine from the current solver state. solve() starts
+            it on an empty timetable and resume() on a restored checkpoint.
+
+        Args:
+            all_slots (int): The GA placements left in the "cell" mode.
+            population (list): The "timetable" mode population to continue
+                from (a list of island populations with islands), or None.
+            generations (int): The generations that population has evolved for.
+            convergence (dict): The convergence state of that population, for
+                a single population. Islands start a new one every epoch.
+
+        Returns:
+            The generated schedule.
+        """
+        self.start_budget()
+        self.last_checkpoint = perf_counter()
+        if self.mode == "backtracking":
+            from genetictabler.backtracking import BacktrackingSolver
+
+            self.solver_report = BacktrackingSolver(self,
+                                                    self.time_budget).solve()
+            return self.finish_run()
+
+        if self.mode == "timetable":
+            if self.islands > 1:
+                best = self.run_island_evolution(
+                    self.population_size,
+                    self.max_fitness,
+                    self.max_generations,
+                    population,
+                    generations,
+                )
+            else:
+                best = self.run_timetable_evolution(
+                    self.population_size,
+                    self.max_fitness,
+                    self.max_generations,
+                    population,
+                    generations,
+                    convergence,
+                )
+            self.fit_timetable(best)
+            return self.finish_run()
+
         while all_slots > 0:
+            if self.budget_exhausted():
+                self.fill_free_cells()
+                break
             gene = self.run_evolution(
-                course_bit_length,
-                slot_bit_length,
+                self.course_bits,
+                self.slot_bits,
                 self.population_size,
                 self.max_fitness,
                 self.max_generations,
             )
             if gene != 0:
+                if self.progress_callback is not None:
+                    fitness = self.cached_fitness(gene)
+                if self.run_metrics is not None:
+                    filled = self.filled_slots
                 self.fit_slot(gene)
+                if self.run_metrics is not None:
+                    self.run_metrics["overwrites"] += filled == self.filled_slots
+                if self.progress_callback is not None:
+                    self.report_progress(fitness)
                 all_slots -= 1
+                self.checkpoint(all_slots=all_slots)
+        return self.finish_run()
+
+    def finish_run(self):
+        """
+        Ends a solve: runs the repair stage if a repair_budget is set, writes the
+            final checkpoint, if checkpoints are enabled, reports the "run"
+            totals and returns the tables.
+        """
+        if self.repair_budget is not None:
+            self.repair(self.repair_budget)
+        if self.checkpoint_path is not None:
+            from genetictabler.checkpoint import save_checkpoint
+
+            save_checkpoint(self, self.checkpoint_path, complete=True)
+        self.report_run()
+        return self.tables
+
+    def repair(self, time_budget=None, max_moves=None):
+        """
+        Improves the solved tables by local search (see genetictabler.repair):
+            courses are swapped between cells of a class, or moved into its empty
+            cells, and each move is scored by the change it makes to the
+            violations around the two cells it touches.
+
+        Args:
+            time_budget (float): Seconds the search may run for, or None for no
+                limit.
+            max_moves (int): The number of moves tried at most. Defaults to 100
+                per cell.
+
+        Returns:
+            dict: The report of LocalSearchRepair.repair(), with the
+                violation_report() "before" and "after" the repair. It is also
+                kept in self.repair_report and, with a metrics_callback set, sent
+                as a "repair" event.
+        """
+        from genetictabler.repair import LocalSearchRepair
+
+        self.repair_report = LocalSearchRepair(self, time_budget,
+                                               max_moves).repair()
+        if self.metrics_callback is not None:
+            self.metrics_callback("repair", self.repair_report)
+        return self.repair_report
+
+    def checkpoint(self, all_slots=0, population=None, generations=0,
+                   convergence=None):
+        """
+        Saves the solver state to checkpoint_path if checkpoint_interval seconds
+            have passed since the last checkpoint. The arguments are the progress
+            that solve_from() needs to continue (see save_checkpoint()).
+        """
+        if (self.checkpoint_path is None or
+                perf_counter() - self.last_checkpoint < self.checkpoint_interval):
+            return
+        from genetictabler.checkpoint import save_checkpoint
+
+        save_checkpoint(self, self.checkpoint_path, all_slots, population,
+                        generations, convergence=convergence)
+        self.last_checkpoint = perf_counter()
+
+    def resume(self, path=None, state=None):
+        """
+        Continues a solve from a checkpoint, with the RNG, quotas and free cells
+            exactly as they were saved, along with the GA's convergence state
+            (patience and adaptive mutation), so a seeded "cell" or "timetable"
+            run ends with the same timetable as if it had never stopped. The
+            generator must be configured like the one that wrote the checkpoint
+            (genetictabler.checkpoint.resume() builds one from the file). New
+            checkpoints go to the same file unless checkpoint_path is set. The
+            budget and the "run" metrics start again from zero.
+
+        Args:
+            path (str): The checkpoint file. Defaults to checkpoint_path.
+            state (dict): An already loaded checkpoint, instead of path.
+
+        Returns:
+            The generated schedule.
+        """
+        from genetictabler.checkpoint import load_checkpoint, restore_state
+
+        path = path or self.checkpoint_path
+        if state is None:
+            state = load_checkpoint(path)
+        if self.checkpoint_path is None:
+            self.checkpoint_path = path
+        self.start_metrics()
+        restore_state(self, state)
+        if state["complete"]:
+            self.report_run()
+            return self.tables
+        return self.solve_from(state["all_slots"], state["population"],
+                               state["generations"], state["convergence"])
+
+    def report_run(self):
+        """
+        Sends the "run" totals to metrics_callback, if one is set.
+        """
+        if self.run_metrics is None:
+            return
+        metrics, self.run_metrics = self.run_metrics, None
+        metrics["cells_placed"] = self.filled_slots
+        metrics["budget_exhausted"] = self.budget_exhausted()
+        metrics["wall_time"] = perf_counter() - metrics["wall_time"]
+        self.metrics_callback("run", metrics)
+
+    def load_tables(self, tables):
+        """
+        Rebuilds the solver state from a timetable solved earlier, e.g. by another
+            process: the genotype is initialised from the constructor arguments and
+            every course of `tables` is placed with fit_cell(). Weekly quotas that
+            the loaded timetable overruns stay negative, as after run(). A seeded
+            generator is reseeded first, so the weekly quota split is the one
+            the solve drew, whatever the RNG did since.
+
+        Args:
+            tables (list): A timetable in the self.tables layout.
+        """
+        if self.seed is not None:
+            self.rng.seed(self.seed)
+        self.initialize_genotype(self.courses, self.classes, self.slots,
+                                 self.days, self.repeat, self.teachers)
+        self.generate_table_skeleton()
+        for class_idx, class_table in enumerate(tables):
+            for day_idx, day in enumerate(class_table):
+                for slot_idx, course in enumerate(day):
+                    if course:
+                        self.fit_cell(class_idx, day_idx, slot_idx, course)
+
+    def resolve(self, tables=None, teachers=None, repeat=None, classes=None):
+        """
+        Re-solves a timetable after a constraint change, without starting over.
+
+        Only the cells that break the new constraints are cleared: for a teacher
+        change, the classes beyond the new teacher count in each slot of that
+        course; for a repeat change, the occurrences beyond the new daily limit
+        in each day of each class; for `classes`, every cell of those classes.
+        The cleared courses go back into course_quota, and only the cleared cells
+        are filled again by fill_free_cells(). The new limits are also written to
+        self.teachers and self.repeat (as per-course lists), so they persist
+        through later calls that rebuild the solver state, such as
+        resolve(tables=...) or load_tables().
+
+        Args:
+            tables (list): A solved timetable to start from. Defaults to the state
+                left by the last run() or resolve().
+            teachers (dict): New teacher counts, keyed by course code.
+            repeat (dict): New daily repetition limits, keyed by course code.
+            classes (iterable): 0-based indexes of classes to re-solve entirely.
+
+        Returns:
+            The updated schedule.
+        """
+        if tables is not None:
+            self.load_tables(tables)
+        self.start_budget()
+
+        if teachers:
+            counts = (list(self.teachers) if not isinstance(self.teachers, int)
+                      else [self.teachers] * self.course_count)
+            for course, count in teachers.items():
+                counts[course - 1] = count
+            self.teachers = counts
+        if repeat:
+            limits = (list(self.repeat) if not isinstance(self.repeat, int)
+                      else [self.repeat] * self.course_count)
+            for course, limit in repeat.items():
+                limits[course - 1] = limit
+            self.repeat = limits
+
+        for course, count in (teachers or {}).items():
+            self.teacher_quota[course - 1] = count
+            if self.teacher_quota_array is not None:
+                self.teacher_quota_array[course - 1] = count
+            for day_idx in range(self.day_count):
+                for slot_idx in range(self.slot_count):
+                    excess = self.slot_course_count[day_idx][slot_idx][
+                        course] - count
+                    for class_idx in reversed(range(self.class_count)):
+                        if excess <= 0:
+                            break
+                        if self.tables[class_idx][day_idx][slot_idx] == course:
+                            self.clear_cell(class_idx, day_idx, slot_idx)
+                            excess -= 1
+
+        for course, limit in (repeat or {}).items():
+            for class_idx in range(self.class_count):
+                self.repeat_quota[class_idx][course - 1] = limit
+                if self.repeat_quota_array is not None:
+                    self.repeat_quota_array[class_idx, course - 1] = limit
+                for day_idx, day in enumerate(self.tables[class_idx]):
+                    excess = self.day_course_count[class_idx][day_idx][
+                        course] - limit
+                    for slot_idx in reversed(range(self.slot_count)):
+                        if excess <= 0:
+                            break
+                        if day[slot_idx] == course:
+                            self.clear_cell(class_idx, day_idx, slot_idx)
+                            excess -= 1
+
+        for class_idx in classes or ():
+            for day_idx in range(self.day_count):
+                for slot_idx in range(self.slot_count):
+                    self.clear_cell(class_idx, day_idx, slot_idx)
+
+        self.fill_free_cells()
         return self.tables
-        
-
-
-total_classes = 4
-no_courses = 5
-slots = 6
-total_days = 5
-daily_repetition = 2
-teachers = [1,2,3,2,2]
-
-my_dict = {
-    0: "FOC",
-    1: "DBM",
-    2: "AD",
-    3: "DM",
-    4: "INE",
-    5: "FOC"
-}
-my_week = {
-    0: "Mon",
-    1: "Tue",
-    2: "Wed",
-    3: "Thur",
-    4: "Fri"
-
-}
-
-table = GenerateTimeTable(total_classes, no_courses, slots, total_days, daily_repetition,teachers)
-i=1
-j=0
-count = 5
-for single_table in table.run():
-    print("BE "+str(count))
-    count = count+ 1
-    i=i+1
-    for days in single_table:
-       print(my_week[j]+str("->"),end=' ')
-       j=j+1
-       for item in days:
-
-         print(my_dict[item], end=' ')
-       print("")
-    j=0
-
-
-
-
-
-    print("-----------------------------------")
-
-# Your existing code goes here...
-
-# Initialize a new workbook
-file_path = "timetable.xlsx"
-
-# Check if the file exists and delete it if it does
-if os.path.exists(file_path):
-    os.remove(file_path)
-
-# Initialize a new workbook
-wb = Workbook()
-
-# Function to convert slot codes to subject names
-def get_subject_name(subject_code):
-    return my_dict[subject_code]
-
-# Function to convert day codes to day names
-def get_day_name(day_code):
-    return my_week[day_code]
-
-# Function to convert time to 12-hour format
-def convert_to_12_hour_format(hour):
-    if hour == 0:
-        return "12 AM"
-    elif hour < 12:
-        return f"{hour} AM"
-    elif hour == 12:
-        return "12 PM"
-    else:
-        return f"{hour - 12} PM"
-
-# Write timetable data to Excel for each class
-for class_idx, class_table in enumerate(table.run(), start=5):
-    class_name = f"Be{class_idx}"
-    ws = wb.create_sheet(title=f"{class_name} Timetable")
-    ws.cell(row=1, column=1).value = f"{class_name} Timetable"
-    ws.cell(row=2, column=1).value = "Day/Time"
-    time = 8  # Starting time
-    for slot_idx, day_table in enumerate(class_table, start=2):
-        ws.cell(row=2, column=slot_idx).value = f"{convert_to_12_hour_format(time)} - {convert_to_12_hour_format(time + 1)}"
-        time += 1
-        # If it's the 6th slot, break the loop
-        if slot_idx == 7:
-            break
-    ws.cell(row=2, column=slot_idx + 1).value = f"{convert_to_12_hour_format(time)} - {convert_to_12_hour_format(time + 1)}"
-
-    for day_idx, day_table in enumerate(class_table, start=3):
-        ws.cell(row=day_idx, column=1).value = get_day_name(day_idx-3)
-        time = 8  # Reset starting time
-        for slot_idx, slot in enumerate(day_table, start=2):
-            ws.cell(row=day_idx, column=slot_idx).value = get_subject_name(slot)
-            time += 1
-        # Add the 6th slot for each day
-
-        
-for col in ws.columns:
-    max_length = 0
-    column = col[0].column
-    for cell in col:
-        try:
-            if len(str(cell.value)) > max_length:
-                max_length = len(cell.value)
-        except:
-            pass
-    adjusted_width = (max_length + 2) * 1.2
-    ws.column_dimensions[get_column_letter(column)].width = adjusted_width
-
-
-# Save the workbook# Save the workbook
-wb.save(file_path)
\ No newline at end of file
+
+    def fill_free_cells(self):
+        """
+        Fills every free cell, one run_evolution() per cell with constructive
+            seeding so the GA only targets free cells. If the GA still returns a
+            gene for a filled cell, the best greedy placement is used instead, so
+            every iteration fills exactly one free cell. Once the budget is
+            exhausted, the remaining cells get generate_constructive_gene() genes
+            without a GA.
+        """
+        while self.free_cells:
+            if self.budget_exhausted():
+                gene = self.generate_constructive_gene()
+            else:
+                gene = self.run_evolution(
+                    self.course_bits,
+                    self.slot_bits,
+                    self.population_size,
+                    self.max_fitness,
+                    self.max_generations,
+                    seeding="constructive",
+                )
+                slot_no, day_no = self.extract_slot_day(gene)
+                class_no = gene & self.class_mask
+                if self.tables[class_no - 1][day_no - 1][slot_no - 1]:
+                    gene = self.generate_greedy_population(1)[0]
+            if self.progress_callback is not None:
+                fitness = self.cached_fitness(gene)
+            self.fit_slot(gene)
+            if self.progress_callback is not None:
+                self.report_progress(fitness)
+
+    def __getstate__(self):
+        """
+        Drops metrics_callback and progress_callback when the generator is
+            pickled for a worker process, since callbacks are often lambdas or
+            bound to local state, and the result cache, fitness memo and
+            reports, which every island epoch would otherwise copy to every
+            worker.
+        """
+        state = self.__dict__.copy()
+        state["metrics_callback"] = None
+        state["progress_callback"] = None
+        state["run_metrics"] = None
+        state["cache"] = None
+        state["fitness_cache"] = {}
+        state["solver_report"] = None
+        state["repair_report"] = None
+        return state
+
+
+def timetable_key(timetable):
+    """
+    Returns a hashable copy of a "timetable" mode individual.
+    """
+    return tuple(map(tuple, timetable))
+
+
+def _evolve_island(table, population, population_size, seed, max_fitness,
+                   max_generations, time_budget=None, max_evaluations=None):
+    """
+    Worker for GenerateTimeTable.run_island_evolution(). It runs in a separate
+        process on a pickled copy of the generator, gives it a fresh RNG seeded for
+        this island epoch and the rest of the run's budget, creates the island's
+        population on the first epoch and returns the evolved population, best
+        first, with the number of individuals scored.
+    """
+    table.rng = Random(seed)
+    table.checkpoint_path = None
+    table.time_budget = time_budget
+    table.max_evaluations = max_evaluations
+    table.start_budget()
+    if population is None:
+        population = [
+            table.generate_timetable() for _ in range(population_size)
+        ]
+    population = table.evolve_timetables(population, max_fitness,
+                                         max_generations)
+    return population, table.evaluations
+
+
+from genetictabler.batch import SolveResult, solve_many  # noqa: E402,F401
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Demo entry point, run with ``python -m genetictabler``.
+
+It solves a small sample timetable once, prints it and, unless --no-excel is
+given, exports the same solution to an Excel workbook with export_excel().
+openpyxl is only imported when the export actually runs.
+"""
+
+import argparse
+
+from genetictabler import GenerateTimeTable
+from genetictabler.export import export_excel
+
+total_classes = 4
+no_courses = 5
+slots = 6
+total_days = 5
+daily_repetition = 2
+teachers = [1, 2, 3, 2, 2]
+
+my_dict = {
+    0: "FOC",
+    1: "DBM",
+    2: "AD",
+    3: "DM",
+    4: "INE",
+    5: "FOC"
+}
+my_week = {
+    0: "Mon",
+    1: "Tue",
+    2: "Wed",
+    3: "Thur",
+    4: "Fri"
+}
+
+
+def get_subject_name(subject_code):
+    """
+    Converts a slot's course code to its subject name.
+    """
+    return my_dict[subject_code]
+
+
+def get_day_name(day_code):
+    """
+    Converts a day index to its day name.
+    """
+    return my_week[day_code]
+
+
+def print_tables(tables):
+    """
+    Prints every class's timetable, one line per day.
+    """
+    count = 5
+    for single_table in tables:
+        print("BE " + str(count))
+        count = count + 1
+        for j, days in enumerate(single_table):
+            print(get_day_name(j) + str("->"), end=' ')
+            for item in days:
+                print(get_subject_name(item), end=' ')
+            print("")
+        print("-----------------------------------")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m genetictabler",
+        description="Generate and print a sample timetable.",
+    )
+    parser.add_argument(
+        "--excel",
+        default="timetable.xlsx",
+        help="workbook to export the timetable to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="seed for a reproducible timetable",
+    )
+    parser.add_argument(
+        "--no-excel",
+        action="store_true",
+        help="only print the timetable, without importing openpyxl",
+    )
+    args = parser.parse_args(argv)
+
+    table = GenerateTimeTable(total_classes, no_courses, slots, total_days,
+                              daily_repetition, teachers, seed=args.seed)
+    tables = table.run()
+    print_tables(tables)
+    if not args.no_excel:
+        class_names = [f"Be{n}" for n in range(5, 5 + len(tables))]
+        export_excel(tables, args.excel, my_dict, my_week, class_names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Solving timetables from asyncio code.
+
+GenerateTimeTable.run() is CPU bound and blocks for the whole solve, so
+AsyncSolver runs every solve in a bounded process pool shared by all its jobs,
+and submit() returns a SolveJob that can be iterated for progress, awaited for
+the tables and cancelled:
+
+    async with AsyncSolver(workers=4) as solver:
+        job = solver.submit(dict(classes=8, courses=6, seed=1), timeout=30)
+        async for progress in job:
+            print(progress.cells_placed, "/", progress.total_cells)
+        tables = await job.result()
+
+Workers send progress through a multiprocessing manager queue at most every
+progress_interval seconds, and at the same points check whether their job was
+cancelled, aborting the solve by raising SolveCancelled from the generator's
+progress_callback. A thread in the parent process forwards the progress to the
+event loop, so the loop never waits on the pool. multiprocessing and
+concurrent.futures are imported when the solver starts.
+"""
+
+import asyncio
+import os
+from collections import namedtuple
+from time import perf_counter
+
+Progress = namedtuple("Progress",
+                      ["cells_placed", "total_cells", "best_fitness"])
+Progress.__doc__ = """
+A progress event of a SolveJob.
+
+cells_placed (int): The cells filled so far.
+total_cells (int): The number of cells of the timetable (classes * days * slots).
+best_fitness (int): The fitness of the last placed gene ("cell" mode) or the best
+    timetable ("timetable" mode); None in the "backtracking" mode.
+"""
+
+
+class SolveCancelled(Exception):
+    """
+    Raised inside a worker to abort a solve whose job was cancelled.
+    """
+
+
+def _solve_job(job_id, config, events, cancelled, interval):
+    """
+    Worker for AsyncSolver.submit(). Runs one configuration with a
+        progress_callback that forwards throttled progress to `events` and raises
+        SolveCancelled once job_id appears in `cancelled`. The last progress and
+        a closing None are always sent, so the job's iterator ends.
+    """
+    from genetictabler.batch import build_table
+
+    table = build_table(config)
+    state = {"reported": None, "latest": None}
+
+    def progress_callback(progress):
+        state["latest"] = progress
+        now = perf_counter()
+        if state["reported"] is not None and now - state["reported"] < interval:
+            return
+        state["reported"] = now
+        if job_id in cancelled:
+            raise SolveCancelled(f"Job {job_id} was cancelled.")
+        events.put((job_id, Progress(**progress)))
+        state["latest"] = None
+
+    table.progress_callback = progress_callback
+    try:
+        tables = table.run()
+        if hasattr(tables, "disown"):
+            # The parent process owns shared tables from now on.
+            tables.disown()
+        return tables
+    finally:
+        if state["latest"] is not None:
+            events.put((job_id, Progress(**state["latest"])))
+        events.put((job_id, None))
+        cancelled.pop(job_id, None)
+
+
+class SolveJob:
+    """
+    One solve submitted to an AsyncSolver.
+
+    Iterating the job with ``async for`` yields its Progress events until the
+    solve ends. result() waits for the tables. cancel(), a timeout, or cancelling
+    the task awaiting result() stop the worker at its next progress check.
+    """
+
+    def __init__(self, solver, job_id, future, timeout=None):
+        """
+        Parameters:
+        solver (AsyncSolver): The solver the job was submitted to.
+        job_id (int): The job's id within the solver.
+        future (concurrent.futures.Future): The pool future of the solve.
+        timeout (float): Seconds after which the job is cancelled and result()
+            raises asyncio.TimeoutError. None means no limit.
+        """
+        loop = asyncio.get_running_loop()
+        self.solver = solver
+        self.job_id = job_id
+        self.pool_future = future
+        self.future = asyncio.wrap_future(future, loop=loop)
+        self.queue = asyncio.Queue()
+        self.timed_out = False
+        self.timer = (None if timeout is None else loop.call_later(
+            timeout, self.expire))
+        self.future.add_done_callback(self.finished)
+
+    def push(self, progress):
+        """
+        Queues a progress event for the iterator; None ends the iteration.
+        """
+        if progress is None:
+            self.solver.jobs.pop(self.job_id, None)
+        self.queue.put_nowait(progress)
+
+    def finished(self, future):
+        """
+        Done callback of the job's future. A job cancelled while running in a
+            worker is flagged for the worker, and a job that failed or never ran
+            ends its iterator here, since no worker will.
+        """
+        if self.timer is not None:
+            self.timer.cancel()
+        if future.cancelled():
+            # Cancelling the asyncio future cancels a pending pool future too;
+            # a running one has to be stopped by the worker itself.
+            if not self.pool_future.done():
+                self.solver.cancelled[self.job_id] = True
+            self.push(None)
+        elif future.exception() is not None:
+            self.push(None)
+
+    def expire(self):
+        """
+        Cancels the job when its timeout runs out.
+        """
+        self.timed_out = True
+        self.cancel()
+
+    def cancel(self):
+        """
+        Cancels the job. Returns False if it had already finished.
+        """
+        return self.future.cancel()
+
+    def done(self):
+        """
+        Returns True once the job has finished, failed or been cancelled.
+        """
+        return self.future.done()
+
+    async def result(self):
+        """
+        Waits for the solved tables.
+
+        Raises:
+            asyncio.TimeoutError: The job's timeout ran out.
+            asyncio.CancelledError: The job was cancelled.
+            Exception: Whatever the solve raised in the worker.
+        """
+        try:
+            return await self.future
+        except asyncio.CancelledError:
+            if self.timed_out:
+                raise asyncio.TimeoutError(
+                    f"Job {self.job_id} timed out.") from None
+            raise
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        progress = await self.queue.get()
+        if progress is None:
+            # Keep the end marker for any later iteration.
+            self.queue.put_nowait(None)
+            raise StopAsyncIteration
+        return progress
+
+
+class AsyncSolver:
+    """
+    Runs GenerateTimeTable solves in a bounded process pool for asyncio code.
+    All jobs share the pool, so concurrent requests queue for its workers
+    instead of each starting a process or blocking the event loop.
+    """
+
+    def __init__(self, workers=None, progress_interval=0.1):
+        """
+        Parameters:
+        workers (int): The number of worker processes. Defaults to the number of
+            CPUs.
+        progress_interval (float): The minimum number of seconds between two
+            progress events of a job, which is also how often a worker checks
+            for cancellation.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.progress_interval = progress_interval
+        self.executor = None
+        self.manager = None
+        self.events = None
+        self.cancelled = None
+        self.reader = None
+        self.loop = None
+        self.jobs = {}
+        self.next_id = 0
+
+    def start(self):
+        """
+        Starts the manager process, the pool and the progress forwarding thread.
+            Called by submit() if needed; ``async with`` starts them without
+            blocking the event loop.
+        """
+        if self.executor is not None:
+            return
+        import threading
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import Manager
+
+        self.manager = Manager()
+        self.events = self.manager.Queue()
+        self.cancelled = self.manager.dict()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.reader = threading.Thread(target=self.forward_events, daemon=True)
+        self.reader.start()
+
+    def forward_events(self):
+        """
+        Runs in the forwarding thread: hands every progress event from the
+            workers to its job on the event loop, until close() sends None.
+        """
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+            job_id, progress = item
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            try:
+                self.loop.call_soon_threadsafe(job.push, progress)
+            except RuntimeError:
+                # The event loop was closed under a running job.
+                return
+
+    def submit(self, config, timeout=None):
+        """
+        Submits one problem to the pool.
+
+        Args:
+            config (dict, list or tuple): Keyword arguments (dict) or positional
+                arguments (list/tuple) for GenerateTimeTable. A progress_callback
+                in it is replaced by the worker's.
+            timeout (float): Seconds after which the job is cancelled.
+
+        Returns:
+            SolveJob: The submitted job.
+        """
+        self.start()
+        self.loop = asyncio.get_running_loop()
+        job_id = self.next_id
+        self.next_id += 1
+        future = self.executor.submit(_solve_job, job_id, config, self.events,
+                                      self.cancelled, self.progress_interval)
+        job = SolveJob(self, job_id, future, timeout)
+        self.jobs[job_id] = job
+        return job
+
+    async def solve(self, config, timeout=None):
+        """
+        Solves one problem without progress events and returns its tables.
+        """
+        return await self.submit(config, timeout).result()
+
+    async def close(self):
+        """
+        Cancels the unfinished jobs, then shuts the pool, thread and manager
+            down without blocking the event loop.
+        """
+        if self.executor is None:
+            return
+        for job in list(self.jobs.values()):
+            job.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+    def shutdown(self):
+        """
+        Blocking part of close(): waits for the workers to stop.
+        """
+        self.executor.shutdown(wait=True)
+        self.events.put(None)
+        self.reader.join()
+        self.manager.shutdown()
+        self.executor = None
+        self.jobs.clear()
+
+    async def __aenter__(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.start)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
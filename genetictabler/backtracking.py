@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Backtracking solver used by GenerateTimeTable(mode="backtracking").
+
+Instead of evolving genes, the solver fills the timetable column by column (one
+column is a (day, slot) across all classes) with a depth-first search. The
+rules calculate_fitness() scores softly are hard constraints here:
+
+1)   A class takes a course at most course_quota times a week.
+2)   A class takes a course at most repeat_quota times a day.
+3)   At most teacher_quota classes take a course in the same slot. With
+     resources, a qualified teacher and room must be free in the slot instead.
+4)   A course is never scheduled in two adjacent slots of the same day.
+
+Within a column the class with the fewest allowed courses is filled first, and
+courses with the most remaining weekly quota are tried first. The candidate
+lists of a column are built once and pruned as its cells are filled; they are
+only rebuilt after a backtrack. The search stops after max_backtracks dead
+ends, once every option has failed (e.g. because fewer teachers than classes
+make full columns impossible) or when what is left of time_budget is only
+enough for the completion step. It then keeps the deepest partial timetable it
+reached and completes the rest of the week greedily with the same rules,
+leaving a cell empty where no course is allowed. Cells that completion cannot
+reach before the budget runs out are left empty too, so the solve ends close to
+time_budget with the whole week decided.
+"""
+
+from time import perf_counter
+
+
+class BacktrackingSolver:
+    """
+    Fills the tables of an initialised GenerateTimeTable by backtracking search.
+    """
+
+    def __init__(self, table, time_budget=None, max_backtracks=None):
+        """
+        Parameters:
+        table (GenerateTimeTable): A generator on which initialize_genotype() and
+            generate_table_skeleton() have been called.
+        time_budget (float): Seconds the search may run for, or None for no limit.
+        max_backtracks (int): Dead ends the search may back out of before it
+            settles for its deepest partial timetable. Defaults to 20 per
+            column, which bounds the search even without a time_budget and,
+            unlike the clock, keeps seeded runs reproducible.
+        """
+        self.table = table
+        self.time_budget = time_budget
+        self.columns = [(day, slot) for day in range(table.day_count)
+                        for slot in range(table.slot_count)]
+        self.max_backtracks = (20 * len(self.columns)
+                               if max_backtracks is None else max_backtracks)
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the search's own counters and grid.
+        """
+        table = self.table
+        self.quota = [list(class_quota) for class_quota in table.course_quota]
+        self.day_count = [[[0] * (table.course_count + 1)
+                           for _ in range(table.day_count)]
+                          for _ in range(table.class_count)]
+        self.slot_count = [[[0] * (table.course_count + 1)
+                            for _ in range(table.slot_count)]
+                           for _ in range(table.day_count)]
+        self.grid = [[[0] * table.slot_count for _ in range(table.day_count)]
+                     for _ in range(table.class_count)]
+        if table.resources is not None:
+            table.resources.reset()
+
+    def candidates(self, class_idx, day, slot):
+        """
+        Returns the courses allowed in a cell, most remaining quota first. Ties
+            are broken by the generator's RNG so seeded runs stay reproducible.
+        """
+        table = self.table
+        quota = self.quota[class_idx]
+        day_count = self.day_count[class_idx][day]
+        slot_count = self.slot_count[day][slot]
+        left = self.grid[class_idx][day][slot - 1] if slot else 0
+        repeat_quota = table.repeat_quota[class_idx]
+        resources = table.resources
+
+        courses = [
+            course for course in range(1, table.course_count + 1)
+            if quota[course - 1] > 0
+            and day_count[course] < repeat_quota[course - 1]
+            and (slot_count[course] < table.teacher_quota[course - 1]
+                 if resources is None else resources.can_host(course, day, slot))
+            and course != left
+        ]
+        table.rng.shuffle(courses)
+        courses.sort(key=lambda course: quota[course - 1], reverse=True)
+        return courses
+
+    def place(self, class_idx, day, slot, course, step):
+        """
+        Adds (step=1) or removes (step=-1) a course in the search's own counters,
+            and assigns or releases its teacher and room.
+        """
+        self.quota[class_idx][course - 1] -= step
+        self.day_count[class_idx][day][course] += step
+        self.slot_count[day][slot][course] += step
+        self.grid[class_idx][day][slot] = course if step > 0 else 0
+        if self.table.resources is not None:
+            if step > 0:
+                self.table.resources.assign(class_idx, day, slot, course)
+            else:
+                self.table.resources.release(class_idx, day, slot)
+
+    def column_options(self, column, done=()):
+        """
+        Returns the candidates() of every class of a column that is not in
+            `done`, as a dict in class order.
+        """
+        day, slot = self.columns[column]
+        return {class_idx: self.candidates(class_idx, day, slot)
+                for class_idx in range(self.table.class_count)
+                if class_idx not in done}
+
+    def prune(self, options, day, slot, course):
+        """
+        Returns the candidate lists of a column's remaining classes after
+            `course` was placed in (day, slot), without the courses that have
+            no teacher (or, with resources, no teacher or room) left there.
+            Only slot-wide counters change within a column, so the lists are
+            otherwise still exact; they are filtered rather than rebuilt, and
+            lists that lose nothing are shared.
+        """
+        table = self.table
+        resources = table.resources
+        if resources is None:
+            if (self.slot_count[day][slot][course] <
+                    table.teacher_quota[course - 1]):
+                return options
+            blocked = {course}
+        else:
+            # A teacher or room may be qualified for several courses.
+            blocked = {option for option in range(1, table.course_count + 1)
+                       if not resources.can_host(option, day, slot)}
+        return {class_idx: (courses if blocked.isdisjoint(courses) else
+                            [option for option in courses
+                             if option not in blocked])
+                for class_idx, courses in options.items()}
+
+    @staticmethod
+    def most_constrained(options):
+        """
+        Returns the first class of a column's options with the fewest
+            candidates.
+        """
+        lengths = list(map(len, options.values()))
+        return list(options)[lengths.index(min(lengths))]
+
+    def complete(self, prefix, deadline=None):
+        """
+        Fills the cells after a partial timetable greedily: column by column,
+            the most constrained class first takes its first candidate course,
+            and a class without any allowed course keeps the cell empty instead
+            of failing the search. Once the deadline passes, the remaining
+            cells are left empty.
+
+        Args:
+            prefix (list): The (class_idx, day, slot, course) placements of the
+                partial timetable, in search order.
+            deadline (float): The perf_counter() time to stop at, or None.
+
+        Returns:
+            list: The placements of the whole timetable, prefix first.
+        """
+        class_count = self.table.class_count
+        self.reset()
+        for class_idx, day, slot, course in prefix:
+            self.place(class_idx, day, slot, course, 1)
+
+        placements = list(prefix)
+        first = len(prefix) // class_count
+        for column in range(first, len(self.columns)):
+            if deadline is not None and perf_counter() > deadline:
+                break
+            day, slot = self.columns[column]
+            done = {placement[0] for placement in prefix[column * class_count:]}
+            options = self.column_options(column, done)
+            while options:
+                class_idx = self.most_constrained(options)
+                courses = options.pop(class_idx)
+                if courses:
+                    self.place(class_idx, day, slot, courses[0], 1)
+                    placements.append((class_idx, day, slot, courses[0]))
+                    options = self.prune(options, day, slot, courses[0])
+        return placements
+
+    def solve(self):
+        """
+        Runs the search and writes the complete timetable, or the deepest partial
+            one found within its limits completed by complete(), into the
+            generator's tables.
+
+        Returns:
+            dict: "solved" (the search filled every cell), "timed_out",
+                "backtrack_limit" (max_backtracks was reached), "assigned",
+                "skipped" (cells left empty) and "cells" counts, "backtracks",
+                "seconds" and the "violations" of the result as given by
+                violation_report().
+        """
+        table = self.table
+        class_count = table.class_count
+        cells = class_count * len(self.columns)
+        deadline = (None if self.time_budget is None else perf_counter() +
+                    self.time_budget)
+        start = perf_counter()
+
+        # Each frame is [class_idx, day, slot, candidates, position]. options
+        # holds the candidates of the current column's unfilled classes; it is
+        # pruned as courses are placed and rebuilt, with fresh tie-breaks, at
+        # each new column and after each backtrack.
+        stack = []
+        options = None
+        # The deepest partial timetable is only copied out of the stack when
+        # the search is about to backtrack below it.
+        best_depth = 0
+        best = []
+        backtracks = placed = 0
+        timed_out = False
+        backtrack_limit = False
+
+        while len(stack) < cells:
+            # Stop while complete() can still replay the deepest timetable and
+            # fill the rest of the week before the deadline, at the pace the
+            # search has placed courses since its first column.
+            if deadline is not None:
+                now = perf_counter()
+                reserve = (cells * (now - start) / placed
+                           if placed >= class_count else 0.0)
+                if now + reserve > deadline:
+                    timed_out = True
+                    break
+            if backtracks >= self.max_backtracks:
+                backtrack_limit = True
+                break
+
+            column = len(stack) // class_count
+            day, slot = self.columns[column]
+            if options is None:
+                done = {frame[0] for frame in stack[column * class_count:]}
+                options = self.column_options(column, done)
+            class_idx = self.most_constrained(options)
+            courses = options.pop(class_idx)
+
+            if courses:
+                stack.append([class_idx, day, slot, courses, 0])
+                placed += 1
+                self.place(class_idx, day, slot, courses[0], 1)
+                options = self.prune(options, day, slot, courses[0]) or None
+                if len(stack) > best_depth:
+                    best_depth = len(stack)
+                    best = None
+                if table.progress_callback is not None:
+                    table.report_progress(None, len(stack))
+                continue
+
+            # Dead end: move the deepest frame with options left to its next
+            # course, dropping exhausted frames on the way.
+            backtracks += 1
+            if best is None:
+                best = self.placements(stack)
+            options = None
+            while stack:
+                frame = stack[-1]
+                self.place(frame[0], frame[1], frame[2], frame[3][frame[4]],
+                           -1)
+                frame[4] += 1
+                if frame[4] < len(frame[3]):
+                    self.place(frame[0], frame[1], frame[2],
+                               frame[3][frame[4]], 1)
+                    break
+                stack.pop()
+            if not stack:
+                break
+
+        solved = len(stack) == cells
+        if solved:
+            best = self.placements(stack)
+        else:
+            if best is None:
+                best = self.placements(stack)
+            best = self.complete(best, deadline)
+        if table.resources is not None:
+            # fit_cell() assigns the resources of the kept cells again.
+            table.resources.reset()
+        for class_idx, day, slot, course in best:
+            table.fit_cell(class_idx, day, slot, course)
+
+        return {
+            "solved": solved,
+            "timed_out": timed_out,
+            "backtrack_limit": backtrack_limit,
+            "assigned": len(best),
+            "skipped": cells - len(best),
+            "cells": cells,
+            "backtracks": backtracks,
+            "seconds": perf_counter() - start,
+            "violations": table.violation_report(),
+        }
+
+    @staticmethod
+    def placements(stack):
+        """
+        Returns the (class_idx, day, slot, course) placements of a search
+            stack.
+        """
+        return [(frame[0], frame[1], frame[2], frame[3][frame[4]])
+                for frame in stack]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Solving many independent timetables at once.
+
+Only the constructor arguments of each problem are sent to the worker processes;
+every worker builds its own GenerateTimeTable, so no solver state is pickled on
+the way in and only the solved tables come back. concurrent.futures and
+traceback are imported on first use to keep ``import genetictabler`` fast.
+"""
+
+import os
+import time
+from collections import namedtuple
+
+SolveResult = namedtuple("SolveResult",
+                         ["index", "config", "tables", "seconds", "error"])
+SolveResult.__doc__ = """
+The outcome of one problem from solve_many().
+
+index (int): The position of the problem in the configs passed to solve_many().
+config (dict, list or tuple): The configuration the problem was built from.
+tables (list): The solved timetable, or None if solving failed.
+seconds (float): The wall time the worker spent on the problem.
+error (str): The formatted exception if solving failed, otherwise None.
+"""
+
+
+def build_table(config):
+    """
+    Builds a GenerateTimeTable from a configuration.
+
+    Args:
+        config (dict, list or tuple): Keyword arguments (dict) or positional
+            arguments (list/tuple) for GenerateTimeTable.
+
+    Returns:
+        GenerateTimeTable: The unsolved generator.
+    """
+    from genetictabler import GenerateTimeTable
+
+    if isinstance(config, dict):
+        return GenerateTimeTable(**config)
+    return GenerateTimeTable(*config)
+
+
+def solve_one(config):
+    """
+    Builds a GenerateTimeTable from a configuration and runs it.
+
+    Args:
+        config (dict, list or tuple): Keyword arguments (dict) or positional
+            arguments (list/tuple) for GenerateTimeTable.
+
+    Returns:
+        The solved timetable.
+    """
+    return build_table(config).run()
+
+
+def _solve_worker(index, config):
+    """
+    Runs solve_one() in a worker process and turns any exception into an error
+        result, so one bad problem does not affect the others. Tables in shared
+        memory are handed over to the parent process (see Grid.disown()).
+    """
+    import traceback
+
+    start = time.perf_counter()
+    try:
+        tables = solve_one(config)
+        if hasattr(tables, "disown"):
+            tables.disown()
+        error = None
+    except Exception:
+        tables = None
+        error = traceback.format_exc()
+    return SolveResult(index, None, tables, time.perf_counter() - start, error)
+
+
+def solve_many(configs, workers=None):
+    """
+    Solves many independent timetable problems in a process pool and yields the
+        results as they finish, which is not necessarily the input order.
+
+    Args:
+        configs (iterable): GenerateTimeTable configurations, each either a dict of
+            keyword arguments or a list/tuple of positional arguments.
+        workers (int): The number of worker processes. Defaults to the number of
+            CPUs.
+
+    Yields:
+        SolveResult: One result per configuration. A problem that raises, or
+            whose worker process dies, yields a result with tables set to None
+            and the error filled in instead of stopping the batch. Breaking out
+            of the loop cancels the problems not started yet; the ones being
+            solved finish in the background.
+
+    Example:
+        >>> configs = [dict(classes=4, courses=5), (6, 5, 6, 5, 2, 2)]
+        >>> for result in solve_many(configs, workers=2):
+        ...     print(result.index, result.error is None)
+    """
+    import traceback
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    configs = list(configs)
+    workers = workers or os.cpu_count() or 1
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_solve_worker, index, config): index
+            for index, config in enumerate(configs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                result = SolveResult(index, None, None, 0.0,
+                                     traceback.format_exc())
+            yield result._replace(config=configs[index])
+    finally:
+        # A caller that stops iterating early closes the generator; the
+        # problems not started yet are cancelled instead of being solved
+        # before it gets control back.
+        executor.shutdown(wait=False, cancel_futures=True)
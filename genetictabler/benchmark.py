@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for genetictabler, run with ``python -m genetictabler.benchmark``.
+
+The import benchmark starts fresh interpreters and times ``import genetictabler``
+in each, so a module-level side effect or an eager heavy import shows up as a
+regression. Pass --max-ms to make the command fail when the median import time
+goes over a limit.
+
+The solver benchmarks time the GA building blocks (calculate_fitness,
+generate_population, crossover, mutation, run_evolution) and complete run()
+solves over a grid of problem and population sizes. Every result records its
+wall time, throughput in genes evaluated per second where that applies, peak
+memory of the full solves and their solution quality (violation_report()).
+
+Every benchmark is timed in --repeat samples, each lasting at least 0.2 s
+(timeit's autorange() picks how many calls that takes), and keeps the fastest
+sample: noise from the rest of the machine only ever adds
+time, so the minimum is the most repeatable estimate. Results can be saved as
+JSON with --output and compared against an earlier file with --baseline; a
+slowdown of the minimum beyond --tolerance fails the command.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+from genetictabler import GenerateTimeTable
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import genetictabler; "
+    "print(time.perf_counter() - t)"
+)
+
+# Problem sizes as (classes, courses, slots, days).
+GRIDS = {
+    "quick": {
+        "problems": [(4, 5, 6, 5), (20, 10, 8, 5)],
+        "population_sizes": [20, 40],
+    },
+    "full": {
+        "problems": [
+            (4, 5, 6, 5),
+            (20, 10, 8, 5),
+            (50, 20, 8, 5),
+            (100, 40, 10, 6),
+            (200, 60, 10, 6),
+        ],
+        "population_sizes": [20, 40, 80],
+    },
+}
+
+# Genes per timed batch of the micro benchmarks.
+BATCH = 2000
+
+
+def measure_import_time(repeat=5, module="genetictabler"):
+    """
+    Times importing a module in `repeat` fresh interpreters.
+
+    Args:
+        repeat (int): The number of interpreters to start.
+        module (str): The module to import.
+
+    Returns:
+        dict: The individual timings, their median, the fastest and the
+            slowest one, in milliseconds.
+    """
+    snippet = IMPORT_SNIPPET.replace("genetictabler", module)
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", snippet],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(float(output) * 1000)
+    return {
+        "module": module,
+        "timings_ms": timings,
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+    }
+
+
+def problem_config(classes, courses, slots, days, **kwargs):
+    """
+    Returns the GenerateTimeTable arguments of a benchmark problem. Each course
+        gets enough teachers for the classes to share it and may be taught
+        twice a day.
+    """
+    return dict(
+        classes=classes,
+        courses=courses,
+        slots=slots,
+        days=days,
+        repeat=2,
+        teachers=-(-classes // courses),
+        **kwargs,
+    )
+
+
+def make_table(classes, courses, slots, days, population_size=40, seed=0,
+               **kwargs):
+    """
+    Builds a seeded generator for a benchmark problem (see problem_config()).
+    """
+    return GenerateTimeTable(**problem_config(
+        classes, courses, slots, days, population_size=population_size,
+        seed=seed, **kwargs))
+
+
+def prepare_table(table, fill=0.5):
+    """
+    Initialises a generator and places random genes until about `fill` of the
+        cells hold a course, so the micro benchmarks score genes against a
+        realistically busy timetable.
+    """
+    table.initialize_genotype(table.courses, table.classes, table.slots,
+                              table.days, table.repeat, table.teachers)
+    table.generate_table_skeleton()
+    target = int(table.total_slots * table.class_count * fill)
+    while table.filled_slots < target:
+        table.fit_slot(table.generate_gene())
+    return table
+
+
+def time_call(function, repeat):
+    """
+    Times `repeat` samples of calls to `function`, each sample calling it as
+        many times as it takes to last 0.2 s, and returns the wall time per
+        call of the fastest sample.
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    return min([elapsed] + timer.repeat(repeat - 1, number)) / number
+
+
+def record(name, params, wall_time, genes=None, **extra):
+    """
+    Builds one benchmark result. `genes` is the number of genes the timed call
+        evaluated or produced, from which the throughput is derived.
+    """
+    result = {
+        "benchmark": name,
+        "params": params,
+        "wall_time": wall_time,
+        "throughput": genes / wall_time if genes and wall_time else None,
+        "peak_memory": None,
+        "quality": None,
+    }
+    result.update(extra)
+    return result
+
+
+def bench_operators(problem, population_size, repeat=5):
+    """
+    Times calculate_fitness, generate_population, both crossovers and mutation
+        for one problem size.
+    """
+    table = prepare_table(make_table(*problem, population_size))
+    params = {"problem": list(problem), "population_size": population_size}
+    genes = table.generate_population(BATCH)
+    pairs = list(zip(genes[::2], genes[1::2]))
+
+    def fitness():
+        for gene in genes:
+            table.calculate_fitness(gene)
+
+    def population():
+        for _ in range(BATCH // population_size):
+            table.generate_population(population_size)
+
+    def single_point():
+        for gene_a, gene_b in pairs:
+            table.single_point_crossover(gene_a, gene_b)
+
+    def multi_point():
+        for gene_a, gene_b in pairs:
+            table.multi_point_crossover(gene_a, gene_b, 3)
+
+    def mutation():
+        for gene in genes:
+            table.mutation(gene, table.course_bits, table.slot_bits)
+
+    return [
+        record("calculate_fitness", params, time_call(fitness, repeat),
+               BATCH),
+        record("generate_population", params, time_call(population, repeat),
+               BATCH // population_size * population_size),
+        record("single_point_crossover", params,
+               time_call(single_point, repeat), BATCH),
+        record("multi_point_crossover", params,
+               time_call(multi_point, repeat), BATCH),
+        record("mutation", params, time_call(mutation, repeat), BATCH),
+    ]
+
+
+def bench_evolution(problem, population_size, repeat=5):
+    """
+    Times single run_evolution calls against a half-filled timetable. The
+        target fitness is unreachable, so every call runs all max_generations
+        generations instead of stopping once a gene scores max_fitness, which
+        on a half-filled table usually happens in the first generation.
+    """
+    evaluations = []
+    table = prepare_table(
+        make_table(
+            *problem,
+            population_size,
+            metrics_callback=lambda event, metrics: evaluations.append(
+                metrics["evaluations"]),
+        ))
+    params = {"problem": list(problem), "population_size": population_size}
+    wall_time = time_call(
+        lambda: table.run_evolution(table.course_bits, table.slot_bits,
+                                    population_size, float("inf"),
+                                    table.max_generations),
+        repeat,
+    )
+    return [
+        record("run_evolution", params, wall_time,
+               statistics.median(evaluations))
+    ]
+
+
+def bench_run(problem, population_size, mode="cell", memory=True, repeat=5):
+    """
+    Times complete run() solves and records their quality and, optionally, the
+        peak memory of a separate traced solve (tracing slows Python down, so
+        it is kept out of the timed ones). The generator is seeded, so every
+        run() repeats the same solve.
+    """
+    totals = {}
+
+    def collect(event, metrics):
+        if event == "run":
+            totals.update(metrics)
+
+    params = {
+        "problem": list(problem),
+        "population_size": population_size,
+        "mode": mode,
+    }
+    table = make_table(*problem, population_size, mode=mode,
+                       metrics_callback=collect)
+    wall_time = time_call(table.run, repeat)
+
+    genes = totals.get("evaluations")
+    if mode == "timetable" and genes:
+        # Every timetable individual scores all of its cells.
+        genes *= table.class_count * table.total_slots
+    result = record("run", params, wall_time, genes,
+                    quality=table.violation_report())
+    if memory:
+        tracemalloc.start()
+        make_table(*problem, population_size, mode=mode).run()
+        result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(grid="quick", modes=("cell",), memory=True, repeat=5,
+              log=print):
+    """
+    Runs the solver benchmarks over a grid of problem and population sizes.
+
+    Args:
+        grid (str): A key of GRIDS.
+        modes (tuple): The GenerateTimeTable modes to solve complete problems in.
+        memory (bool): Whether to measure the peak memory of complete solves.
+        repeat (int): The number of timed samples of every benchmark.
+        log (callable): Called with a line of text after every result, or None.
+
+    Returns:
+        list: The benchmark results.
+    """
+    results = []
+    for problem in GRIDS[grid]["problems"]:
+        for population_size in GRIDS[grid]["population_sizes"]:
+            batch = bench_operators(problem, population_size, repeat)
+            batch += bench_evolution(problem, population_size, repeat)
+            for mode in modes:
+                batch.append(
+                    bench_run(problem, population_size, mode, memory, repeat))
+            for result in batch:
+                if log:
+                    log(format_result(result))
+            results += batch
+    return results
+
+
+def result_key(result):
+    """
+    Identifies a result across runs by its benchmark name and parameters.
+    """
+    return result["benchmark"] + " " + json.dumps(result["params"],
+                                                  sort_keys=True)
+
+
+def format_result(result):
+    """
+    Formats one result as a line of text.
+    """
+    line = "{:<72} {:>10.4f} s".format(result_key(result),
+                                       result["wall_time"])
+    if result["throughput"]:
+        line += " {:>12.0f} genes/s".format(result["throughput"])
+    if result["peak_memory"]:
+        line += " {:>8.1f} MiB".format(result["peak_memory"] / 2**20)
+    if result["quality"]:
+        line += " {} violations".format(result["quality"]["total"])
+    return line
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Compares results with a baseline run, matching them by result_key().
+
+    Args:
+        results (list): The current results.
+        baseline (list): The results to compare against.
+        tolerance (float): The relative slowdown above which a benchmark counts
+            as a regression.
+
+    Returns:
+        list: (key, baseline wall time, current wall time, ratio, regressed)
+            tuples for every benchmark present in both runs.
+    """
+    previous = {result_key(result): result for result in baseline}
+    rows = []
+    for result in results:
+        key = result_key(result)
+        if key not in previous:
+            continue
+        before, after = previous[key]["wall_time"], result["wall_time"]
+        ratio = after / before if before else float("inf")
+        rows.append((key, before, after, ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m genetictabler.benchmark",
+        description="Benchmark genetictabler.",
+    )
+    parser.add_argument("--suite", choices=("import", "solver", "all"),
+                        default="all",
+                        help="benchmarks to run (default: %(default)s)")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick",
+                        help="problem sizes to cover (default: %(default)s)")
+    parser.add_argument("--modes", nargs="+", default=["cell"],
+                        help="modes to solve complete problems in")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed samples of every benchmark, the fastest "
+                        "of which is kept (default: %(default)s)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced peak memory solves")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the median import time exceeds this")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--baseline",
+                        help="compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative slowdown counted as a regression "
+                        "(default: %(default)s)")
+    args = parser.parse_args(argv)
+    status = 0
+    results = []
+
+    if args.suite in ("import", "all"):
+        result = measure_import_time(args.repeat)
+        print("import genetictabler: median {:.2f} ms, max {:.2f} ms".format(
+            result["median_ms"], result["max_ms"]))
+        results.append(
+            record("import", {}, result["min_ms"] / 1000))
+        if args.max_ms is not None and result["median_ms"] > args.max_ms:
+            print("import time regression: {:.2f} ms > {:.2f} ms".format(
+                result["median_ms"], args.max_ms))
+            status = 1
+
+    if args.suite in ("solver", "all"):
+        results += run_suite(args.grid, tuple(args.modes), not args.no_memory,
+                             args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key, before, after, ratio, regressed in compare(
+                results, baseline, args.tolerance):
+            print("{:<72} {:>10.4f} -> {:>10.4f} s  x{:.2f}{}".format(
+                key, before, after, ratio, "  REGRESSION" if regressed else ""))
+            status = status or int(regressed)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
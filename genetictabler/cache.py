@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Result caches for GenerateTimeTable.run().
+
+A seeded run is fully determined by its constructor arguments, so its tables
+can be stored under a fingerprint of those arguments and returned by the next
+run() with the same configuration instead of solving again. The fingerprint
+includes SOLVER_VERSION, so entries written by an older solver are never
+returned once the version is bumped.
+
+Tables are stored compactly as a small header followed by the courses of every
+cell as unsigned 16-bit ints. MemoryCache keeps them in an LRU dict,
+DirectoryCache in one file per entry with a total size limit.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from array import array
+from collections import OrderedDict
+
+from genetictabler import SOLVER_VERSION
+
+# Constructor arguments that change the tables run() returns for a given seed.
+FINGERPRINT_FIELDS = (
+    "classes",
+    "courses",
+    "slots",
+    "days",
+    "repeat",
+    "teachers",
+    "seed",
+    "population_size",
+    "max_fitness",
+    "max_generations",
+    "mode",
+    "islands",
+    "migration_interval",
+    "seeding",
+    "time_budget",
+    "patience",
+    "min_diversity",
+    "max_evaluations",
+)
+
+HEADER = struct.Struct("<4sHHH")
+MAGIC = b"GTT1"
+
+
+def fingerprint(table):
+    """
+    Returns a canonical hash of the inputs that determine a generator's result,
+        or None for an unseeded generator, whose result cannot be reused.
+
+    Args:
+        table (GenerateTimeTable): The generator to fingerprint.
+
+    Returns:
+        str: A hex digest, or None.
+    """
+    if table.seed is None:
+        return None
+    fields = {name: getattr(table, name) for name in FINGERPRINT_FIELDS}
+    if table.resources is not None:
+        fields["resources"] = table.resources.canonical()
+    if table.repair_budget is not None:
+        fields["repair_budget"] = table.repair_budget
+    # Operator settings only join the fingerprint when changed, so cached
+    # results of default runs keep their keys.
+    for name in ("crossover_points", "mutation_rounds"):
+        if getattr(table, name) != 1:
+            fields[name] = getattr(table, name)
+    fields["solver_version"] = SOLVER_VERSION
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def pack_tables(tables):
+    """
+    Serialises tables[class][day][slot] into compact bytes. Compact Grid tables
+        are copied from their buffer directly.
+    """
+    classes = len(tables)
+    days = len(tables[0]) if classes else 0
+    slots = len(tables[0][0]) if days else 0
+    if hasattr(tables, "tobytes"):
+        cells = tables.tobytes()
+    else:
+        cells = array("H", (course for class_table in tables
+                            for day in class_table
+                            for course in day)).tobytes()
+    return HEADER.pack(MAGIC, classes, days, slots) + cells
+
+
+def unpack_tables(data):
+    """
+    Restores tables[class][day][slot] from pack_tables() bytes.
+    """
+    magic, classes, days, slots = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a packed timetable.")
+    cells = array("H")
+    cells.frombytes(data[HEADER.size:])
+    cells = cells.tolist()
+    return [[
+        cells[(class_idx * days + day_idx) * slots:(class_idx * days +
+                                                    day_idx + 1) * slots]
+        for day_idx in range(days)
+    ] for class_idx in range(classes)]
+
+
+class MemoryCache:
+    """
+    An in-process cache of packed tables with least-recently-used eviction.
+    """
+
+    def __init__(self, max_entries=128):
+        """
+        Parameters:
+        max_entries (int): The number of timetables kept before the least
+            recently used one is evicted.
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """
+        Returns the tables stored under key, or None.
+        """
+        data = self.entries.get(key)
+        if data is None:
+            return None
+        self.entries.move_to_end(key)
+        return unpack_tables(data)
+
+    def put(self, key, tables):
+        """
+        Stores tables under key, evicting the least recently used entries.
+        """
+        self.entries[key] = pack_tables(tables)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        self.entries.clear()
+
+
+class DirectoryCache:
+    """
+    An on-disk cache with one packed file per timetable. Files are written
+    atomically, so concurrent processes can share a directory, and the least
+    recently used files are deleted once the directory exceeds max_bytes.
+    """
+
+    suffix = ".tt"
+
+    def __init__(self, path, max_bytes=64 * 2**20):
+        """
+        Parameters:
+        path (str): The cache directory. It is created if missing.
+        max_bytes (int): The total size of the cached files to stay under.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def file_path(self, key):
+        """
+        Returns the path of the file for key.
+        """
+        return os.path.join(self.path, key + self.suffix)
+
+    def get(self, key):
+        """
+        Returns the tables stored under key, or None. A hit refreshes the file's
+            modification time, which eviction uses as its last use.
+        """
+        file_path = self.file_path(key)
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            os.utime(file_path)
+        except FileNotFoundError:
+            return None
+        try:
+            return unpack_tables(data)
+        except (ValueError, struct.error):
+            return None
+
+    def put(self, key, tables):
+        """
+        Stores tables under key, then evicts files until the size limit holds.
+        """
+        file_path = self.file_path(key)
+        temp_path = "{}.{}.tmp".format(file_path, os.getpid())
+        with open(temp_path, "wb") as f:
+            f.write(pack_tables(tables))
+        os.replace(temp_path, file_path)
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes the least recently used files while the directory is over
+            max_bytes.
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Removes every cached file.
+        """
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(self.suffix):
+                os.remove(entry.path)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Checkpoints of long solves.
+
+With checkpoint_path set, GenerateTimeTable.run() saves its state every
+checkpoint_interval seconds: the tables, course_quota, repeat_quota and
+teacher_quota, the order of free_cells, the teacher and room assignments, the
+placements left (all_slots), the RNG state and, in the "timetable" mode, the
+current population (of every island) and the convergence state of a single
+population, so patience and adaptive mutation carry on where they stopped. A
+final checkpoint marked complete is written when the solve ends. The
+"backtracking" mode only writes the final one.
+
+A checkpoint is a zlib-compressed pickle behind a short magic header, written
+to a temporary file that is synced and then renamed over the old one, so a
+crash leaves either the previous or the new checkpoint, never a partial one.
+Checkpoints are pickles: only resume files you wrote yourself.
+
+The counters derived from the tables (day_course_count, slot_course_count, the
+NumPy mirrors) are not stored; restore_state() rebuilds them with
+load_tables().
+"""
+
+import os
+import pickle
+import zlib
+from array import array
+
+from genetictabler import SOLVER_VERSION
+from genetictabler.cache import pack_tables, unpack_tables
+
+MAGIC = b"GTC1"
+
+# Constructor arguments that GenerateTimeTable needs to continue a checkpoint.
+CONFIG_FIELDS = (
+    "classes",
+    "courses",
+    "slots",
+    "days",
+    "repeat",
+    "teachers",
+    "population_size",
+    "max_fitness",
+    "max_generations",
+    "subject_codes_to_names",
+    "vectorized",
+    "mode",
+    "islands",
+    "workers",
+    "migration_interval",
+    "seed",
+    "seeding",
+    "time_budget",
+    "patience",
+    "min_diversity",
+    "max_evaluations",
+    "resources",
+    "storage",
+    "checkpoint_interval",
+    "repair_budget",
+    "crossover_points",
+    "mutation_rounds",
+)
+
+# Configuration that must match for a checkpoint to be restored.
+SHAPE_FIELDS = ("classes", "courses", "slots", "days", "mode", "islands")
+
+
+def save_checkpoint(table, path, all_slots=0, population=None, generations=0,
+                    complete=False, convergence=None):
+    """
+    Atomically writes the state of a solve to a checkpoint file.
+
+    Args:
+        table (GenerateTimeTable): The generator being solved.
+        path (str): The checkpoint file. It is replaced if it exists.
+        all_slots (int): The GA placements left in the "cell" mode.
+        population (list): The "timetable" mode population (a list of island
+            populations with islands), or None.
+        generations (int): The generations that population has evolved for.
+        complete (bool): Whether the solve has finished.
+        convergence (dict): The convergence state of that population (see
+            GenerateTimeTable.check_convergence()), or None.
+    """
+    state = {
+        "solver_version": SOLVER_VERSION,
+        "config": {name: getattr(table, name)
+                   for name in CONFIG_FIELDS},
+        "tables": pack_tables(table.tables),
+        "course_quota": [list(quota) for quota in table.course_quota],
+        "repeat_quota": [list(quota) for quota in table.repeat_quota],
+        "teacher_quota": list(table.teacher_quota),
+        "free_cells": array("I", table.free_cells).tobytes(),
+        "all_slots": all_slots,
+        "rng": table.rng.getstate(),
+        "population": population,
+        "generations": generations,
+        "convergence": None if convergence is None else dict(convergence),
+        "complete": complete,
+    }
+    if table.resources is not None:
+        state["assignments"] = [
+            (resources.busy, resources.assigned)
+            for resources in (table.resources.teachers, table.resources.rooms)
+        ]
+
+    data = MAGIC + zlib.compress(
+        pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint file written by save_checkpoint().
+
+    Returns:
+        dict: The saved state.
+
+    Raises:
+        ValueError: The file is not a checkpoint, or was written by another
+            SOLVER_VERSION.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError("{} is not a timetable checkpoint.".format(path))
+    state = pickle.loads(zlib.decompress(data[len(MAGIC):]))
+    if state["solver_version"] != SOLVER_VERSION:
+        raise ValueError(
+            "{} was written by solver version {}, this is version {}.".format(
+                path, state["solver_version"], SOLVER_VERSION))
+    return state
+
+
+def restore_state(table, state):
+    """
+    Puts a generator into the state saved in a checkpoint: the tables are
+        loaded with load_tables(), then the saved quotas, free cell order,
+        resource assignments and RNG state replace the rebuilt ones.
+
+    Raises:
+        ValueError: The generator's dimensions or mode differ from the
+            checkpoint's.
+    """
+    config = state["config"]
+    for name in SHAPE_FIELDS:
+        if getattr(table, name) != config[name]:
+            raise ValueError(
+                "The checkpoint was written with {}={!r}, not {!r}.".format(
+                    name, config[name], getattr(table, name)))
+
+    table.load_tables(unpack_tables(state["tables"]))
+    for saved, quotas in ((state["course_quota"], table.course_quota),
+                          (state["repeat_quota"], table.repeat_quota)):
+        for class_quota, row in zip(saved, quotas):
+            for course_idx, quota in enumerate(class_quota):
+                row[course_idx] = quota
+    table.teacher_quota[:] = state["teacher_quota"]
+
+    free_cells = array("I")
+    free_cells.frombytes(state["free_cells"])
+    if table.storage == "lists":
+        free_cells = free_cells.tolist()
+    table.free_cells = free_cells
+    for position, cell in enumerate(free_cells):
+        table.free_cell_index[cell] = position
+
+    if table.resources is not None and "assignments" in state:
+        for resources, (busy, assigned) in zip(
+            (table.resources.teachers, table.resources.rooms),
+                state["assignments"]):
+            resources.busy = list(busy)
+            resources.assigned = list(assigned)
+
+    if table.table_array is not None:
+        import numpy as np
+
+        table.course_quota_array = np.array(table.course_quota, dtype=np.int64)
+        table.repeat_quota_array = np.array(table.repeat_quota, dtype=np.int64)
+        table.teacher_quota_array = np.array(table.teacher_quota,
+                                             dtype=np.int64)
+        if table.hostable_array is not None:
+            for day_idx in range(table.day_count):
+                for slot_idx in range(table.slot_count):
+                    table.update_hostable(day_idx, slot_idx)
+
+    table.fitness_cache.clear()
+    table.rng.setstate(state["rng"])
+
+
+def resume(path, **options):
+    """
+    Builds a GenerateTimeTable from the configuration saved in a checkpoint and
+        continues its solve.
+
+    Args:
+        path (str): The checkpoint file.
+        **options: Constructor arguments to add or override, e.g. callbacks,
+            which are not saved.
+
+    Returns:
+        GenerateTimeTable: The generator, solved; its tables hold the timetable.
+
+    Example:
+        >>> table = resume("overnight.ckpt", metrics_callback=print)
+        >>> table.violation_report()
+    """
+    from genetictabler import GenerateTimeTable
+
+    state = load_checkpoint(path)
+    config = dict(state["config"], checkpoint_path=path)
+    config.update(options)
+    table = GenerateTimeTable(**config)
+    table.resume(path, state)
+    return table
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Excel export of solved timetables.
+
+export_excel() takes tables that have already been solved, so exporting never
+re-runs the GA. It writes with openpyxl's write-only mode, which streams every
+row to disk instead of keeping the whole workbook in memory, and it works out
+each sheet's column widths from the timetable before writing the first row.
+openpyxl is imported when an export actually runs.
+"""
+
+
+def convert_to_12_hour_format(hour):
+    """
+    Converts an hour of the day to 12-hour format, e.g. 13 -> "1 PM".
+    """
+    hour %= 24
+    if hour == 0:
+        return "12 AM"
+    elif hour < 12:
+        return f"{hour} AM"
+    elif hour == 12:
+        return "12 PM"
+    else:
+        return f"{hour - 12} PM"
+
+
+def column_width(values):
+    """
+    Returns the width of a column that fits the longest of `values`.
+    """
+    return (max(len(str(value)) for value in values) + 2) * 1.2
+
+
+def timetable_rows(class_table, class_name, subject_names, day_names,
+                   start_hour=8):
+    """
+    Builds the rows of one class's sheet: a title row, a header row of slot
+        times and one row per day of subject names.
+
+    Args:
+        class_table (list): The class's timetable, class_table[day][slot].
+        class_name (str): The name shown in the title row.
+        subject_names (dict): Maps course codes to subject names. Codes without
+            a name are written as the code itself.
+        day_names (dict or list): Maps day indexes to day names.
+        start_hour (int): The hour the first slot starts at. Every slot lasts an
+            hour.
+
+    Returns:
+        list: The rows, each a list of cell values.
+    """
+    slots = len(class_table[0]) if class_table else 0
+    header = ["Day/Time"] + [
+        "{} - {}".format(convert_to_12_hour_format(start_hour + slot),
+                         convert_to_12_hour_format(start_hour + slot + 1))
+        for slot in range(slots)
+    ]
+    rows = [[f"{class_name} Timetable"], header]
+    for day_idx, day in enumerate(class_table):
+        rows.append([day_names[day_idx]] +
+                    [subject_names.get(course, course) for course in day])
+    return rows
+
+
+def export_excel(tables, file_path, subject_names, day_names,
+                 class_names=None, start_hour=8):
+    """
+    Writes solved tables to an Excel workbook, one sheet per class.
+
+    Args:
+        tables (list): Solved tables, tables[class][day][slot], e.g. the return
+            value of GenerateTimeTable.run().
+        file_path (str): The workbook to write. An existing file is replaced.
+        subject_names (dict): Maps course codes to subject names.
+        day_names (dict or list): Maps day indexes to day names.
+        class_names (list): The name of every class. Defaults to "Class 1",
+            "Class 2", ...
+        start_hour (int): The hour the first slot of a day starts at.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    if class_names is None:
+        class_names = [f"Class {n}" for n in range(1, len(tables) + 1)]
+
+    wb = Workbook(write_only=True)
+    for class_name, class_table in zip(class_names, tables):
+        rows = timetable_rows(class_table, class_name, subject_names,
+                              day_names, start_hour)
+        # Sheet titles are limited to 31 characters.
+        ws = wb.create_sheet(title=f"{class_name} Timetable"[:31])
+
+        # Write-only sheets need their dimensions before the first row.
+        columns = max(len(row) for row in rows)
+        for column in range(columns):
+            values = [row[column] for row in rows if column < len(row)]
+            ws.column_dimensions[get_column_letter(
+                column + 1)].width = column_width(values)
+
+        for row in rows:
+            ws.append(row)
+
+    wb.save(file_path)
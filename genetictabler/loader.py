@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Loading institutional data from spreadsheets.
+
+Courses are read from a sheet (XLSX) or file (CSV) with a header row and the
+columns below; column names are matched case-insensitively and extra columns
+are ignored.
+
+- subject: The subject's name.
+- teachers: The number of teachers available for the course.
+- repeat: How many times a day the course may be taught.
+- code (optional): The course code. Codes must be 1, 2, ... n in any order;
+  without the column, courses are numbered in row order.
+
+Classes are read the same way from a "class" (or "name") column, or given as a
+count. XLSX files are opened in openpyxl's read-only mode, which streams rows
+instead of loading the workbook, and every row is validated in a single pass
+that reports all problems at once.
+"""
+
+import csv
+import os
+from collections import namedtuple
+
+Institution = namedtuple("Institution",
+                         ["config", "class_names", "subject_names"])
+Institution.__doc__ = """
+Loaded institutional data.
+
+config (dict): Keyword arguments for GenerateTimeTable (classes, courses, slots,
+    days, repeat, teachers, subject_codes_to_names and any extra options).
+class_names (list): The name of every class, in class order.
+subject_names (dict): Maps course codes to subject names.
+"""
+
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm")
+
+
+def read_rows(path, sheet=None):
+    """
+    Yields the rows of a CSV file or of one sheet of an XLSX workbook as tuples,
+        starting with the header row.
+
+    Args:
+        path (str): The CSV or XLSX file.
+        sheet (str): The sheet to read from a workbook. Defaults to the first
+            sheet.
+    """
+    if os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.worksheets[0]
+            yield from ws.iter_rows(values_only=True)
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from (tuple(row) for row in csv.reader(f))
+
+
+def sheet_names(path):
+    """
+    Returns the sheet names of an XLSX workbook, or [] for a CSV file.
+    """
+    if os.path.splitext(path)[1].lower() not in EXCEL_EXTENSIONS:
+        return []
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        return wb.sheetnames
+    finally:
+        wb.close()
+
+
+def parse_count(value):
+    """
+    Returns value as a positive int, or None if it is not one. Spreadsheets
+        often store whole numbers as floats or strings.
+    """
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != int(number) or number < 1:
+        return None
+    return int(number)
+
+
+def header_index(header, names, errors, source, required=True):
+    """
+    Returns the position of the first of `names` in a header row, or None. A
+        missing required column is added to errors.
+    """
+    header = [str(cell).strip().lower() if cell is not None else ""
+              for cell in header]
+    for name in names:
+        if name in header:
+            return header.index(name)
+    if required:
+        errors.append("{}: missing column '{}'".format(source, names[0]))
+    return None
+
+
+def load_courses(path, sheet=None, errors=None):
+    """
+    Reads and validates the course rows.
+
+    Args:
+        path (str): The CSV or XLSX file.
+        sheet (str): The workbook sheet, for XLSX files.
+        errors (list): Validation problems are appended here.
+
+    Returns:
+        tuple: The teachers list, repeat list and subject name dict, indexed and
+            keyed by course code.
+    """
+    errors = [] if errors is None else errors
+    source = "{}[{}]".format(path, sheet) if sheet else path
+    rows = read_rows(path, sheet)
+    header = next(rows, None)
+    if header is None:
+        errors.append("{}: no header row".format(source))
+        return [], [], {}
+
+    subject_col = header_index(header, ("subject", "name"), errors, source)
+    teachers_col = header_index(header, ("teachers",), errors, source)
+    repeat_col = header_index(header, ("repeat",), errors, source)
+    code_col = header_index(header, ("code",), errors, source, False)
+    if None in (subject_col, teachers_col, repeat_col):
+        return [], [], {}
+
+    width = len(header)
+    courses = {}
+    for line, row in enumerate(rows, start=2):
+        if not any(cell not in (None, "") for cell in row):
+            continue
+        # Short CSV rows are padded so every column lookup is valid.
+        row = tuple(row) + (None, ) * (width - len(row))
+        where = "{} row {}".format(source, line)
+
+        code = len(courses) + 1
+        if code_col is not None:
+            code = parse_count(row[code_col])
+            if code is None:
+                errors.append("{}: invalid code {!r}".format(
+                    where, row[code_col]))
+                continue
+        if code in courses:
+            errors.append("{}: duplicate code {}".format(where, code))
+            continue
+
+        subject = row[subject_col]
+        teachers = parse_count(row[teachers_col])
+        repeat = parse_count(row[repeat_col])
+        if subject in (None, ""):
+            errors.append("{}: missing subject".format(where))
+        if teachers is None:
+            errors.append("{}: invalid teachers {!r}".format(
+                where, row[teachers_col]))
+        if repeat is None:
+            errors.append("{}: invalid repeat {!r}".format(
+                where, row[repeat_col]))
+        courses[code] = (str(subject).strip(), teachers, repeat)
+
+    if not courses:
+        errors.append("{}: no courses".format(source))
+    missing = sorted(set(range(1, len(courses) + 1)) - set(courses))
+    if missing:
+        errors.append("{}: course codes must be 1..{}, missing {}".format(
+            source, len(courses), missing))
+        return [], [], {}
+
+    codes = range(1, len(courses) + 1)
+    return (
+        [courses[code][1] for code in codes],
+        [courses[code][2] for code in codes],
+        {code: courses[code][0]
+         for code in codes},
+    )
+
+
+def load_classes(path, sheet=None, errors=None):
+    """
+    Reads and validates the class names.
+
+    Args:
+        path (str): The CSV or XLSX file.
+        sheet (str): The workbook sheet, for XLSX files.
+        errors (list): Validation problems are appended here.
+
+    Returns:
+        list: The class names.
+    """
+    errors = [] if errors is None else errors
+    source = "{}[{}]".format(path, sheet) if sheet else path
+    rows = read_rows(path, sheet)
+    header = next(rows, None)
+    if header is None:
+        errors.append("{}: no header row".format(source))
+        return []
+    name_col = header_index(header, ("class", "name"), errors, source)
+    if name_col is None:
+        return []
+
+    names = []
+    seen = set()
+    for line, row in enumerate(rows, start=2):
+        name = row[name_col] if name_col < len(row) else None
+        if name in (None, ""):
+            continue
+        name = str(name).strip()
+        if name in seen:
+            errors.append("{} row {}: duplicate class {!r}".format(
+                source, line, name))
+            continue
+        seen.add(name)
+        names.append(name)
+    if not names:
+        errors.append("{}: no classes".format(source))
+    return names
+
+
+def load_institution(courses, classes=None, slots=7, days=5, **options):
+    """
+    Loads courses and classes from spreadsheets into a ready GenerateTimeTable
+        configuration, raising one ValueError that lists every invalid row.
+
+    Args:
+        courses (str): A CSV file of courses, or an XLSX workbook with a
+            "courses" sheet (or courses on its first sheet).
+        classes (str or int): A CSV/XLSX file of class names, or the number of
+            classes. Defaults to the "classes" sheet of the courses workbook.
+        slots (int): The number of time slots available in a day.
+        days (int): The number of days in a week.
+        **options: Further GenerateTimeTable arguments, added to the config.
+
+    Returns:
+        Institution: The configuration, class names and subject names.
+
+    Example:
+        >>> institution = load_institution("data.xlsx", slots=6, days=5, seed=1)
+        >>> tables = GenerateTimeTable(**institution.config).run()
+    """
+    errors = []
+    sheets = sheet_names(courses)
+    course_sheet = "courses" if "courses" in sheets else None
+    teachers, repeat, subject_names = load_courses(courses, course_sheet,
+                                                   errors)
+
+    if classes is None:
+        if "classes" not in sheets:
+            raise ValueError(
+                "No classes given and {} has no 'classes' sheet.".format(
+                    courses))
+        class_names = load_classes(courses, "classes", errors)
+    elif isinstance(classes, int):
+        class_names = [f"Class {n}" for n in range(1, classes + 1)]
+    else:
+        class_sheet = "classes" if "classes" in sheet_names(classes) else None
+        class_names = load_classes(classes, class_sheet, errors)
+
+    if errors:
+        raise ValueError("Invalid institutional data:\n" + "\n".join(errors))
+
+    config = {
+        "classes": len(class_names),
+        "courses": len(teachers),
+        "slots": slots,
+        "days": days,
+        "repeat": repeat,
+        "teachers": teachers,
+        "subject_codes_to_names": subject_names,
+    }
+    config.update(options)
+    return Institution(config, class_names, subject_names)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+Local-search repair used by GenerateTimeTable(repair_budget=...).
+
+A solved timetable can still break the rules calculate_fitness() only scores
+softly. The repair stage improves it afterwards by simulated annealing over a
+swap/move neighbourhood: a move exchanges the contents of two cells of the same
+class, or moves a course into an empty cell of its class. Either way every
+class keeps the courses it was given, so the weekly course quota and the empty
+cell counts of violation_report() never change, and the search works on the
+other rules:
+
+1)   A course in two adjacent slots of the same day ("adjacent").
+2)   A course more than repeat_quota times in a day ("repeat").
+3)   More classes holding a course in a slot than its teacher_quota, or with
+     resources, a placed cell left without a teacher or room ("teacher",
+     "room").
+
+A move only touches two cells, so it is scored by its delta: the violations of
+the days, slots and courses it touches are counted from the generator's
+day_course_count and slot_course_count before and after the move, instead of
+scoring the whole table again. Worse moves are accepted with a probability that
+falls as the temperature cools, and the best timetable seen is kept. The
+temperature follows the share of max_moves tried, or of the time budget used
+when that is larger, so a seeded repair that finishes its moves within the
+budget is reproducible.
+"""
+
+from math import exp
+from time import perf_counter
+
+
+class LocalSearchRepair:
+    """
+    Improves the filled tables of a GenerateTimeTable by simulated annealing.
+    """
+
+    def __init__(self, table, time_budget=None, max_moves=None,
+                 temperature=0.5):
+        """
+        Parameters:
+        table (GenerateTimeTable): A generator whose tables have been solved.
+        time_budget (float): Seconds the search may run for, or None for no limit.
+        max_moves (int): The number of moves tried at most. Defaults to 100 per
+            cell. The temperature cools linearly over them, or over the time
+            budget if that runs out first.
+        temperature (float): The starting temperature. A move that adds one
+            violation is first accepted with a probability of exp(-1 / temperature).
+        """
+        self.table = table
+        self.time_budget = time_budget
+        self.cells = table.class_count * table.total_slots
+        self.max_moves = 100 * self.cells if max_moves is None else max_moves
+        self.temperature = temperature
+
+    def penalty(self, class_idx, cells, courses):
+        """
+        Counts the violations that involve the given cells of a class and the
+            given courses: adjacent repeats next to the cells, repeat quota
+            overruns of the courses in the cells' days and teacher (or resource)
+            clashes in the cells' slots.
+
+        Args:
+            class_idx (int): The 0-based class.
+            cells (tuple): The 0-based (day, slot) cells.
+            courses (tuple): The courses in the cells before or after a move.
+        """
+        table = self.table
+        tables = table.tables[class_idx]
+        day_counts = table.day_course_count[class_idx]
+        repeat_quota = table.repeat_quota[class_idx]
+        last = table.slot_count - 1
+        courses = [course for course in set(courses) if course]
+
+        pairs = set()
+        for day_idx, slot_idx in cells:
+            if slot_idx > 0:
+                pairs.add((day_idx, slot_idx - 1))
+            if slot_idx < last:
+                pairs.add((day_idx, slot_idx))
+        penalty = 0
+        for day_idx, slot_idx in pairs:
+            day = tables[day_idx]
+            course = day[slot_idx]
+            penalty += bool(course) and course == day[slot_idx + 1]
+
+        for day_idx in {day_idx for day_idx, _ in cells}:
+            for course in courses:
+                penalty += max(
+                    0, day_counts[day_idx][course] - repeat_quota[course - 1])
+
+        resources = table.resources
+        if resources is None:
+            for day_idx, slot_idx in cells:
+                slot_counts = table.slot_course_count[day_idx][slot_idx]
+                for course in courses:
+                    penalty += max(0, slot_counts[course] -
+                                   table.teacher_quota[course - 1])
+            return penalty
+
+        for day_idx, slot_idx in cells:
+            if not tables[day_idx][slot_idx]:
+                continue
+            cell = class_idx * resources.week + resources.time(
+                day_idx, slot_idx)
+            for resource_set in (resources.teachers, resources.rooms):
+                penalty += (bool(resource_set.entities)
+                            and resource_set.assigned[cell] < 0)
+        return penalty
+
+    def swap(self, class_idx, first, second):
+        """
+        Exchanges the courses of two cells of a class with clear_cell() and
+            fit_cell(), so quotas, counters, free cells and resources follow.
+        """
+        table = self.table
+        tables = table.tables[class_idx]
+        course_a = tables[first[0]][first[1]]
+        course_b = tables[second[0]][second[1]]
+        table.clear_cell(class_idx, *first)
+        table.clear_cell(class_idx, *second)
+        if course_b:
+            table.fit_cell(class_idx, first[0], first[1], course_b)
+        if course_a:
+            table.fit_cell(class_idx, second[0], second[1], course_a)
+
+    def copy_state(self):
+        """
+        Returns a copy of the tables and of the teacher and room assignments,
+            for restore().
+        """
+        table = self.table
+        tables = [[list(day) for day in class_table]
+                  for class_table in table.tables]
+        if table.resources is None:
+            return tables, None
+        return tables, [(list(resource_set.busy), list(resource_set.assigned))
+                        for resource_set in (table.resources.teachers,
+                                             table.resources.rooms)]
+
+    def restore(self, snapshot):
+        """
+        Puts a state copied by copy_state() back. Each class holds the same
+            courses in both timetables, so its changed cells are all cleared
+            before any is refilled; the assignments that fit_cell() makes are
+            then replaced by the copied ones.
+        """
+        table = self.table
+        tables, assignments = snapshot
+        for class_idx, class_table in enumerate(tables):
+            current = table.tables[class_idx]
+            changed = [(day_idx, slot_idx)
+                       for day_idx, day in enumerate(class_table)
+                       for slot_idx, course in enumerate(day)
+                       if current[day_idx][slot_idx] != course]
+            for day_idx, slot_idx in changed:
+                table.clear_cell(class_idx, day_idx, slot_idx)
+            for day_idx, slot_idx in changed:
+                course = class_table[day_idx][slot_idx]
+                if course:
+                    table.fit_cell(class_idx, day_idx, slot_idx, course)
+
+        if assignments is None:
+            return
+        for resource_set, (busy, assigned) in zip(
+            (table.resources.teachers, table.resources.rooms), assignments):
+            resource_set.busy = busy
+            resource_set.assigned = assigned
+        if table.hostable_array is not None:
+            for day_idx in range(table.day_count):
+                for slot_idx in range(table.slot_count):
+                    table.update_hostable(day_idx, slot_idx)
+
+    def total_penalty(self, report):
+        """
+        Returns the violations of a violation_report() that moves can change.
+        """
+        return (report["adjacent"] + report["repeat"] + report["teacher"] +
+                report["room"])
+
+    def repair(self):
+        """
+        Runs the search on the generator's tables and leaves the best timetable
+            found in them.
+
+        Returns:
+            dict: The violation_report() "before" and "after" the repair, the
+                moves "tried" and "accepted", "improvements" (moves that reached
+                a new best), whether the search "timed_out" and its "seconds".
+        """
+        table = self.table
+        rng = table.rng
+        start = perf_counter()
+        deadline = (None if self.time_budget is None else start +
+                    self.time_budget)
+        before = table.violation_report()
+        current = best = self.total_penalty(before)
+        snapshot = None
+        tried = accepted = improvements = 0
+        timed_out = False
+        slot_count = table.slot_count
+        total_slots = table.total_slots
+
+        elapsed = 0.0
+
+        while tried < self.max_moves and best > 0 and total_slots > 1:
+            # Checking the clock costs more than a move.
+            if deadline is not None and tried % 64 == 0:
+                now = perf_counter()
+                if now > deadline:
+                    timed_out = True
+                    break
+                elapsed = (now - start) / self.time_budget
+            tried += 1
+            class_idx = rng.randrange(table.class_count)
+            first, second = rng.sample(range(total_slots), 2)
+            first = divmod(first, slot_count)
+            second = divmod(second, slot_count)
+            tables = table.tables[class_idx]
+            courses = (tables[first[0]][first[1]],
+                       tables[second[0]][second[1]])
+            if courses[0] == courses[1]:
+                continue
+
+            cells = (first, second)
+            old = self.penalty(class_idx, cells, courses)
+            self.swap(class_idx, first, second)
+            delta = self.penalty(class_idx, cells, courses) - old
+
+            temperature = self.temperature * (
+                1 - max(tried / self.max_moves, elapsed))
+            if delta > 0 and (temperature <= 0 or
+                              rng.random() >= exp(-delta / temperature)):
+                self.swap(class_idx, first, second)
+                continue
+            accepted += 1
+            current += delta
+            if current < best:
+                best = current
+                improvements += 1
+                snapshot = None
+            elif delta > 0 and snapshot is None:
+                # Leaving the best timetable: remember it as it was before the
+                # move.
+                self.swap(class_idx, first, second)
+                snapshot = self.copy_state()
+                self.swap(class_idx, first, second)
+
+        if snapshot is not None and current > best:
+            self.restore(snapshot)
+
+        return {
+            "before": before,
+            "after": table.violation_report(),
+            "tried": tried,
+            "accepted": accepted,
+            "improvements": improvements,
+            "timed_out": timed_out,
+            "seconds": perf_counter() - start,
+        }
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+Teachers and rooms for GenerateTimeTable(resources=...).
+
+Without resources a course's teachers are only a count (teacher_quota), and a
+clash is approximated by counting the classes that hold the course in a slot.
+With a Resources model every placed cell is assigned a real teacher and room
+that are qualified for its course, available at that time and not already busy
+with another class.
+
+Each ResourceSet keeps its state as ints used as bitsets over its entities:
+qualified[course] marks who can take a course, available[time] who may work at
+a (day, slot) and busy[time] who is already assigned then. Finding a free,
+qualified resource is therefore ``qualified & available & ~busy`` whatever the
+number of teachers or rooms, and fit_cell()/clear_cell() update busy with a
+single bit.
+"""
+
+from collections import namedtuple
+
+Teacher = namedtuple("Teacher", ["name", "courses", "unavailable"],
+                     defaults=(None, ()))
+Teacher.__doc__ = """
+A teacher.
+
+name (str): The teacher's name.
+courses (iterable): The course codes the teacher can take. None means every
+    course.
+unavailable (iterable): 0-based (day, slot) pairs at which the teacher cannot
+    be scheduled.
+"""
+
+Room = namedtuple("Room", ["name", "courses", "unavailable"],
+                  defaults=(None, ()))
+Room.__doc__ = """
+A room.
+
+name (str): The room's name.
+courses (iterable): The course codes the room is suited for, e.g. the courses
+    needing a lab. None means every course.
+unavailable (iterable): 0-based (day, slot) pairs at which the room is booked
+    otherwise.
+"""
+
+
+class ResourceSet:
+    """
+    The assignment state of one kind of resource (teachers or rooms).
+    """
+
+    def __init__(self, entities):
+        """
+        Parameters:
+        entities (iterable): The Teacher or Room entities. Their position is
+            their index in the bitsets.
+        """
+        self.entities = list(entities)
+        self.qualified = []
+        self.available = []
+        self.busy = []
+        self.assigned = []
+
+    def bind(self, days, slots, classes, courses):
+        """
+        Builds the bitsets for a timetable's dimensions and clears every
+            assignment.
+
+        Args:
+            days (int): The number of days in a week.
+            slots (int): The number of slots in a day.
+            classes (int): The number of classes.
+            courses (int): The number of courses.
+        """
+        everyone = (1 << len(self.entities)) - 1
+        self.qualified = [0] * (courses + 1)
+        self.available = [everyone] * (days * slots)
+        for index, entity in enumerate(self.entities):
+            bit = 1 << index
+            codes = (range(1, courses + 1)
+                     if entity.courses is None else entity.courses)
+            for course in codes:
+                if 1 <= course <= courses:
+                    self.qualified[course] |= bit
+            for day, slot in entity.unavailable:
+                if 0 <= day < days and 0 <= slot < slots:
+                    self.available[day * slots + slot] &= ~bit
+        self.reset(classes * days * slots)
+
+    def reset(self, cells=None):
+        """
+        Clears every assignment, keeping the qualifications and availability.
+        """
+        self.busy = [0] * len(self.available)
+        self.assigned = [-1] * (len(self.assigned) if cells is None else cells)
+
+    def free(self, course, time):
+        """
+        Returns the bitset of resources that could take `course` at `time`
+            (day * slots + slot); 0 if there is none.
+        """
+        return self.qualified[course] & self.available[time] & ~self.busy[time]
+
+    def take(self, course, time, cell):
+        """
+        Assigns the lowest-indexed free resource to a cell and marks it busy.
+
+        Returns:
+            int: The resource's index, or -1 if none was free (a clash).
+        """
+        free = self.free(course, time)
+        if not free:
+            self.assigned[cell] = -1
+            return -1
+        index = (free & -free).bit_length() - 1
+        self.busy[time] |= 1 << index
+        self.assigned[cell] = index
+        return index
+
+    def release(self, time, cell):
+        """
+        Frees the resource assigned to a cell, if any.
+        """
+        index = self.assigned[cell]
+        if index >= 0:
+            self.busy[time] &= ~(1 << index)
+            self.assigned[cell] = -1
+
+    def count(self, course):
+        """
+        Returns the number of resources qualified for a course. It reads the
+            entities, so it works before bind().
+        """
+        return sum(1 for entity in self.entities
+                   if entity.courses is None or course in entity.courses)
+
+    def schedule(self, index, slots, days):
+        """
+        Returns the 0-based (class, day, slot) cells a resource is assigned to.
+        """
+        cells = []
+        week = days * slots
+        for cell, assigned in enumerate(self.assigned):
+            if assigned == index:
+                class_idx, time = divmod(cell, week)
+                cells.append((class_idx, ) + divmod(time, slots))
+        return cells
+
+    def canonical(self):
+        """
+        Returns the entities as plain, sorted lists for fingerprinting.
+        """
+        return [[
+            entity.name,
+            None if entity.courses is None else sorted(entity.courses),
+            sorted(map(list, entity.unavailable)),
+        ] for entity in self.entities]
+
+
+class Resources:
+    """
+    The teachers and rooms of an institution. An empty set is not checked, so
+    a model with only teachers places courses in any room.
+    """
+
+    def __init__(self, teachers=(), rooms=()):
+        """
+        Parameters:
+        teachers (iterable): Teacher entities.
+        rooms (iterable): Room entities.
+        """
+        self.teachers = ResourceSet(teachers)
+        self.rooms = ResourceSet(rooms)
+        self.days = 0
+        self.slots = 0
+        self.week = 0
+
+    def bind(self, days, slots, classes, courses):
+        """
+        Prepares both resource sets for a timetable's dimensions, clearing every
+            assignment. Called by GenerateTimeTable.generate_table_skeleton().
+        """
+        self.days = days
+        self.slots = slots
+        self.week = days * slots
+        self.teachers.bind(days, slots, classes, courses)
+        self.rooms.bind(days, slots, classes, courses)
+
+    def reset(self):
+        """
+        Clears every assignment.
+        """
+        self.teachers.reset()
+        self.rooms.reset()
+
+    def time(self, day_idx, slot_idx):
+        """
+        Returns the bitset index of a (day, slot). Day indexes wrap, as in
+            GenerateTimeTable.extract_slot_day().
+        """
+        return day_idx % self.days * self.slots + slot_idx
+
+    def can_host(self, course, day_idx, slot_idx):
+        """
+        Returns True if a qualified teacher and room are free at a (day, slot).
+        """
+        time = self.time(day_idx, slot_idx)
+        return ((not self.teachers.entities
+                 or self.teachers.free(course, time) != 0)
+                and (not self.rooms.entities
+                     or self.rooms.free(course, time) != 0))
+
+    def assign(self, class_idx, day_idx, slot_idx, course):
+        """
+        Assigns a teacher and a room to a placed course.
+
+        Returns:
+            tuple: The teacher's and the room's index, -1 for a clash.
+        """
+        time = self.time(day_idx, slot_idx)
+        cell = class_idx * self.week + time
+        teacher = room = -1
+        if self.teachers.entities:
+            teacher = self.teachers.take(course, time, cell)
+        if self.rooms.entities:
+            room = self.rooms.take(course, time, cell)
+        return teacher, room
+
+    def release(self, class_idx, day_idx, slot_idx):
+        """
+        Frees the teacher and room of a cell that is cleared or overwritten.
+        """
+        time = self.time(day_idx, slot_idx)
+        cell = class_idx * self.week + time
+        self.teachers.release(time, cell)
+        self.rooms.release(time, cell)
+
+    def assignment(self, class_idx, day_idx, slot_idx):
+        """
+        Returns the Teacher and Room assigned to a cell, None where there is
+            none.
+        """
+        cell = class_idx * self.week + self.time(day_idx, slot_idx)
+        teacher = self.teachers.assigned[cell] if self.teachers.entities else -1
+        room = self.rooms.assigned[cell] if self.rooms.entities else -1
+        return (
+            self.teachers.entities[teacher] if teacher >= 0 else None,
+            self.rooms.entities[room] if room >= 0 else None,
+        )
+
+    def teacher_counts(self, courses):
+        """
+        Returns how many teachers can take each course, as a teacher_quota list.
+        """
+        return [self.teachers.count(course) for course in range(1, courses + 1)]
+
+    def column_clashes(self, courses, time):
+        """
+        Counts the clashes that assigning a column of courses (one per class,
+            0 for an empty cell) at `time` would cause: courses that get no
+            qualified, available teacher, and those that get no room, each
+            taking the lowest-indexed free resource in class order, as assign()
+            does in empty tables. Nothing is assigned.
+        """
+        clashes = 0
+        for resource_set in (self.teachers, self.rooms):
+            if not resource_set.entities:
+                continue
+            qualified = resource_set.qualified
+            free = resource_set.available[time]
+            for course in courses:
+                if course:
+                    options = qualified[course] & free
+                    if options:
+                        free &= ~(options & -options)
+                    else:
+                        clashes += 1
+        return clashes
+
+    def clashes(self, tables):
+        """
+        Counts the placed cells that got no teacher and no room. `tables` must be
+            the generator's own tables, whose assignments this model holds.
+
+        Returns:
+            tuple: The "teacher" and "room" clash counts.
+        """
+        teacher = room = 0
+        for class_idx, class_table in enumerate(tables):
+            for day_idx, day in enumerate(class_table):
+                for slot_idx, course in enumerate(day):
+                    if not course:
+                        continue
+                    cell = class_idx * self.week + day_idx * self.slots + slot_idx
+                    teacher += (bool(self.teachers.entities)
+                                and self.teachers.assigned[cell] < 0)
+                    room += (bool(self.rooms.entities)
+                             and self.rooms.assigned[cell] < 0)
+        return teacher, room
+
+    def canonical(self):
+        """
+        Returns the model as plain lists for the result cache's fingerprint.
+        """
+        return [self.teachers.canonical(), self.rooms.canonical()]
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Compact storage for very large timetables.
+
+By default GenerateTimeTable keeps its tables and per-class counters as nested
+lists, which cost a pointer per cell plus a list object per row. With
+storage="compact" they are Grids instead: one flat array of 16-bit ints per
+structure, with the familiar ``grid[class][day][slot]`` access provided by
+light views (rows are memoryview slices, so reading and writing a cell stays an
+index operation).
+
+With storage="shared" the flat buffers live in multiprocessing shared memory.
+Pickling such a Grid only sends the segment's name, so another process started
+by multiprocessing attaches to the same memory instead of receiving a copy, and
+writers reading the rows never copy them either. The process that created the
+memory releases it with unlink(); leftovers are removed by multiprocessing's
+resource tracker when it exits. A worker that sends its tables back to the
+parent (as solve_many() and genetictabler.aio do) disown()s them first, so the
+memory belongs to the parent from then on.
+"""
+
+from array import array
+from math import prod
+from multiprocessing.shared_memory import SharedMemory
+
+NUMPY_TYPES = {"H": "uint16", "h": "int16", "I": "uint32"}
+
+
+class Segment(SharedMemory):
+    """
+    Shared memory that may be garbage collected before the memoryviews of a
+    Grid: the mapping is then left to be unmapped with the last view instead of
+    raising BufferError from __del__.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+class Grid:
+    """
+    A nested-list look-alike over a flat buffer of ints. Indexing the first
+    axis returns a Grid for the remaining axes, and the last axis is a writable
+    memoryview, so grid[i][j][k] reads and assigns a cell like nested lists do.
+    """
+
+    __slots__ = ("view", "shape", "offset", "shm", "stride", "inner")
+
+    def __init__(self, view, shape, offset=0, shm=None):
+        """
+        Parameters:
+        view (memoryview): The flat buffer, cast to its item type.
+        shape (tuple): The size of each axis.
+        offset (int): The position of this (sub-)grid's first item in view.
+        shm (Segment): The shared memory holding view, if any.
+        """
+        self.view = view
+        self.shape = tuple(shape)
+        self.offset = offset
+        self.shm = shm
+        self.stride = prod(self.shape[1:])
+        self.inner = self.shape[1:]
+
+    @classmethod
+    def zeros(cls, typecode, shape, shared=False):
+        """
+        Creates a zero-filled grid.
+
+        Args:
+            typecode (str): An array typecode such as "H" (unsigned 16-bit).
+            shape (tuple): The size of each axis.
+            shared (bool): Allocate the buffer in shared memory.
+        """
+        size = prod(shape)
+        if not shared:
+            return cls(memoryview(array(typecode, bytes(size * array(
+                typecode).itemsize))), shape)
+        nbytes = size * array(typecode).itemsize
+        shm = Segment(create=True, size=max(nbytes, 1))
+        # New shared memory is zero-filled.
+        return cls(shm.buf[:nbytes].cast(typecode), shape, shm=shm)
+
+    @classmethod
+    def attach(cls, name, typecode, shape, offset=0, size=None):
+        """
+        Attaches to a grid in shared memory created by another process.
+
+        Args:
+            name (str): The shared memory's name (grid.shm.name).
+            typecode (str): The grid's array typecode.
+            shape (tuple): The size of each axis.
+            offset (int): The position of the grid's first item.
+            size (int): The number of items in the shared buffer.
+        """
+        shm = Segment(name=name)
+        if size is None:
+            size = offset + prod(shape)
+        view = shm.buf[:size * array(typecode).itemsize].cast(typecode)
+        return cls(view, shape, offset, shm)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.shape[0]))]
+        if index < 0:
+            index += self.shape[0]
+        if not 0 <= index < self.shape[0]:
+            raise IndexError("grid index out of range")
+        start = self.offset + index * self.stride
+        if len(self.inner) == 1:
+            return self.view[start:start + self.stride]
+        if not self.inner:
+            return self.view[start]
+        return Grid(self.view, self.inner, start, self.shm)
+
+    def __setitem__(self, index, value):
+        if len(self.shape) != 1:
+            raise TypeError("Only the cells of a grid can be assigned.")
+        self.view[self.offset + range(self.shape[0])[index]] = value
+
+    def __iter__(self):
+        for index in range(self.shape[0]):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, Grid):
+            other = other.tolist()
+        return self.tolist() == other
+
+    def flat(self):
+        """
+        Returns the memoryview of this grid's items, without copying.
+        """
+        return self.view[self.offset:self.offset + prod(self.shape)]
+
+    def tolist(self):
+        """
+        Returns the grid as nested lists.
+        """
+        items = self.flat().tolist()
+        for size in reversed(self.shape[1:]):
+            items = [items[i:i + size] for i in range(0, len(items), size)]
+        return items
+
+    def tobytes(self):
+        """
+        Returns the grid's items as bytes in native byte order.
+        """
+        return self.flat().tobytes()
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+
+        items = np.frombuffer(self.flat(), dtype=NUMPY_TYPES[self.view.format])
+        return items.reshape(self.shape).astype(dtype or items.dtype)
+
+    def share(self):
+        """
+        Returns this grid in shared memory: the grid itself if it already is,
+            otherwise a shared copy.
+        """
+        if self.shm is not None:
+            return self
+        grid = Grid.zeros(self.view.format, self.shape, shared=True)
+        grid.view[:] = self.flat()
+        return grid
+
+    def __reduce__(self):
+        if self.shm is not None:
+            return (Grid.attach, (self.shm.name, self.view.format, self.shape,
+                                  self.offset, len(self.view)))
+        return (Grid.from_array, (array(self.view.format, self.tobytes()),
+                                  self.shape))
+
+    @classmethod
+    def from_array(cls, items, shape):
+        """
+        Wraps a flat array as a grid of the given shape.
+        """
+        return cls(memoryview(items), shape)
+
+    def disown(self):
+        """
+        Hands the shared memory, if any, over to another process: this process
+            stops tracking it, so its resource tracker does not remove the
+            memory when the process exits. Worker processes call it on the
+            tables they send back; attaching in the receiving process tracks
+            the memory there instead.
+        """
+        if self.shm is not None:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    def close(self):
+        """
+        Detaches from the shared memory, if any. Views of the grid taken before
+            must have been dropped.
+        """
+        if self.shm is not None:
+            self.view.release()
+            self.shm.close()
+
+    def unlink(self):
+        """
+        Detaches and frees the shared memory; called once by the process that
+            created it.
+        """
+        if self.shm is not None:
+            self.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __repr__(self):
+        return "Grid({!r}, shape={})".format(self.view.format, self.shape)
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps for choosing solver defaults, run with
+``python -m genetictabler.tuning``.
+
+Every configuration of a grid of GA settings (population_size,
+max_generations, crossover_points and mutation_rounds by default) is solved on
+the same problem once per seed, in a process pool. Each run records its wall
+time, the individuals it scored (GenerateTimeTable.evaluations) and the
+violations left in its timetable (violation_report()). The runs of a
+configuration are then summarised by the mean and variance of each measure, and
+a configuration is on the Pareto front when no other one is both at least as
+fast and leaves at most as many violations, while being strictly better in
+one of the two.
+
+Runs share the machine, so wall times from a parallel sweep are comparable
+with each other but slower than a solve on an idle machine; pass --workers 1 for
+undisturbed timings.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+
+# The GenerateTimeTable arguments swept by default, and their values.
+SEARCH_SPACE = {
+    "population_size": [20, 40, 80],
+    "max_generations": [25, 50, 100],
+    "crossover_points": [1, 3],
+    "mutation_rounds": [1, 2],
+}
+
+# Problem as (classes, courses, slots, days).
+PROBLEM = (8, 6, 6, 5)
+
+# Measures recorded for every run, summarised per configuration.
+MEASURES = ("wall_time", "evaluations", "violations")
+
+
+def parameter_grid(space):
+    """
+    Expands a search space into every combination of its values.
+
+    Args:
+        space (dict): Maps GenerateTimeTable argument names to lists of values.
+
+    Returns:
+        list: One dict of arguments per combination, in a stable order.
+    """
+    names = sorted(space)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def make_config(problem, params, seed, mode="cell"):
+    """
+    Builds the GenerateTimeTable arguments of one run: the benchmark problem
+        (see benchmark.problem_config()) with the run's seed and parameters.
+    """
+    from genetictabler.benchmark import problem_config
+
+    config = problem_config(*problem, mode=mode, seed=seed)
+    config.update(params)
+    return config
+
+
+def _tune_worker(index, config):
+    """
+    Solves one run of a sweep in a worker process. As in batch._solve_worker(),
+        an exception becomes an error result, so one invalid run does not end
+        the sweep.
+
+    Returns:
+        tuple: The run's index and either its wall_time, evaluations,
+            violations and full violation_report(), or the formatted "error".
+    """
+    import traceback
+
+    from genetictabler.batch import build_table
+
+    try:
+        table = build_table(config)
+        start = time.perf_counter()
+        table.run()
+        wall_time = time.perf_counter() - start
+        report = table.violation_report()
+    except Exception:
+        return index, {"error": traceback.format_exc()}
+    return index, {
+        "wall_time": wall_time,
+        "evaluations": table.evaluations,
+        "violations": report["total"],
+        "report": report,
+    }
+
+
+def run_sweep(problem=PROBLEM, space=None, seeds=5, workers=None, mode="cell",
+              log=print):
+    """
+    Solves every configuration of a search space once per seed, in parallel.
+
+    Args:
+        problem (tuple): (classes, courses, slots, days) of the problem to solve.
+        space (dict): The search space. Defaults to SEARCH_SPACE.
+        seeds (int): The number of seeded runs per configuration (seeds 0 to
+            seeds - 1), so every configuration solves the same instances.
+        workers (int): The number of worker processes. Defaults to the number of
+            CPUs.
+        mode (str): The GenerateTimeTable mode of the runs.
+        log (callable): Called with a line of text after every run, or None.
+
+    Returns:
+        list: One dict per configuration with its "params", the list of its
+            "runs", each holding the run's "seed" and measures, and the list of
+            its "errors", each holding the "seed" and "error" of a run that
+            raised or whose worker process died.
+    """
+    import traceback
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    grid = parameter_grid(SEARCH_SPACE if space is None else space)
+    results = [{"params": params, "runs": [], "errors": []} for params in grid]
+    jobs = [(config_idx, seed) for config_idx in range(len(grid))
+            for seed in range(seeds)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()
+                             or 1) as executor:
+        futures = {}
+        for index, (config_idx, seed) in enumerate(jobs):
+            config = make_config(problem, grid[config_idx], seed, mode)
+            futures[executor.submit(_tune_worker, index, config)] = index
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                index, run = future.result()
+            except Exception:
+                index, run = futures[future], {"error": traceback.format_exc()}
+            config_idx, seed = jobs[index]
+            run["seed"] = seed
+            failed = "error" in run
+            results[config_idx]["errors" if failed else "runs"].append(run)
+            if log:
+                log("[{}/{}] {} seed={}: {}".format(
+                    done, len(jobs), json.dumps(grid[config_idx],
+                                                sort_keys=True), seed,
+                    "failed: " + run["error"].strip().splitlines()[-1]
+                    if failed else "{:.3f} s, {} violations".format(
+                        run["wall_time"], run["violations"])))
+
+    for result in results:
+        result["runs"].sort(key=lambda run: run["seed"])
+        result["errors"].sort(key=lambda run: run["seed"])
+    return results
+
+
+def summarize(results):
+    """
+    Adds the mean and variance of every measure over the successful runs of
+        each configuration ("wall_time_mean", "wall_time_variance" and so on)
+        and marks the configurations on the Pareto front of mean wall time
+        against mean violations with "pareto". A configuration whose runs all
+        failed gets None for every measure and is never on the front.
+
+    Returns:
+        list: The results, fastest configuration first and failed ones last.
+    """
+    solved = [result for result in results if result["runs"]]
+    for result in results:
+        for measure in MEASURES:
+            values = [run[measure] for run in result["runs"]]
+            result[measure + "_mean"] = (statistics.fmean(values)
+                                         if values else None)
+            result[measure + "_variance"] = (statistics.variance(values)
+                                             if len(values) > 1 else
+                                             0.0 if values else None)
+    for result in results:
+        result["pareto"] = bool(result["runs"]) and not any(
+            dominates(other, result) for other in solved)
+    solved.sort(key=lambda r: (r["wall_time_mean"], r["violations_mean"]))
+    return solved + [result for result in results if not result["runs"]]
+
+
+def dominates(a, b):
+    """
+    Returns True if configuration `a` is at least as fast as `b` and leaves at
+        most as many violations on average, and is strictly better in one.
+    """
+    a_costs = (a["wall_time_mean"], a["violations_mean"])
+    b_costs = (b["wall_time_mean"], b["violations_mean"])
+    return (all(x <= y for x, y in zip(a_costs, b_costs))
+            and a_costs != b_costs)
+
+
+def format_table(results, pareto_only=False):
+    """
+    Formats summarised results as a text table, one configuration per line.
+        Pareto-optimal configurations are starred, and the runs that failed
+        are counted.
+    """
+    names = sorted({name for result in results for name in result["params"]})
+    header = "  ".join("{:>16}".format(name) for name in names)
+    lines = [
+        "  " + header + "  {:>18}  {:>12}  {:>16}  {:>14}  {:>6}".format(
+            "wall_time (s)", "evaluations", "violations", "violations var",
+            "failed")
+    ]
+    for result in results:
+        if pareto_only and not result["pareto"]:
+            continue
+        params = "  ".join("{:>16}".format(str(result["params"].get(name)))
+                           for name in names)
+        if result["runs"]:
+            measures = ("{:>9.3f} +/-{:<5.3f}  {:>12.0f}  {:>16.2f}  "
+                        "{:>14.2f}").format(
+                result["wall_time_mean"], result["wall_time_variance"]**0.5,
+                result["evaluations_mean"], result["violations_mean"],
+                result["violations_variance"])
+        else:
+            measures = "{:>18}  {:>12}  {:>16}  {:>14}".format("-", "-", "-",
+                                                              "-")
+        lines.append("{} ".format("*" if result["pareto"] else " ") + params +
+                     "  " + measures +
+                     "  {:>6}".format(len(result["errors"])))
+    return "\n".join(lines)
+
+
+def parse_space(items):
+    """
+    Parses --param NAME=V1,V2 options into a search space; values are read as
+        JSON where possible, e.g. numbers, and kept as strings otherwise.
+    """
+    space = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if not values:
+            raise ValueError(
+                "Expected NAME=VALUE[,VALUE...], got {!r}.".format(item))
+        parsed = []
+        for value in values.split(","):
+            try:
+                parsed.append(json.loads(value))
+            except ValueError:
+                parsed.append(value)
+        space[name] = parsed
+    return space
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m genetictabler.tuning",
+        description="Sweep GA settings over seeded runs and report the Pareto "
+        "front of speed against quality.",
+    )
+    parser.add_argument("--problem", nargs=4, type=int, metavar=("CLASSES",
+                                                                  "COURSES",
+                                                                  "SLOTS",
+                                                                  "DAYS"),
+                        default=list(PROBLEM),
+                        help="problem to solve (default: %(default)s)")
+    parser.add_argument("--param", action="append", default=[],
+                        metavar="NAME=V1,V2",
+                        help="GenerateTimeTable argument and values to sweep; "
+                        "replaces the default search space when given")
+    parser.add_argument("--seeds", type=int, default=5,
+                        help="seeded runs per configuration "
+                        "(default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--mode", default="cell",
+                        help="GenerateTimeTable mode (default: %(default)s)")
+    parser.add_argument("--pareto-only", action="store_true",
+                        help="only print the Pareto-optimal configurations")
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not log every run")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        space = parse_space(args.param) if args.param else None
+    except ValueError as error:
+        parser.error(str(error))
+    results = summarize(
+        run_sweep(tuple(args.problem), space, args.seeds, args.workers,
+                  args.mode, None if args.quiet else print))
+    print(format_table(results, args.pareto_only))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Machine-readable writers for solved timetables.
+
+Every writer takes tables[class][day][slot] as returned by
+GenerateTimeTable.run() and works through it one class at a time, so a batch of
+thousands of timetables never has to be converted in one piece:
+
+- write_csv(): one row per cell (class, day, slot, course, subject).
+- write_jsonl(): one JSON object per class.
+- write_parquet(): the CSV columns as a Parquet file with one row group per
+  class. Requires pyarrow, which is imported on use.
+- write_html(): a page with one table per class, rendered from the
+  timetable.html template next to this module.
+
+`target` is either a file path or an open file object (text mode, or binary
+for Parquet).
+"""
+
+import csv
+import json
+import os
+from contextlib import contextmanager
+from html import escape
+from string import Template
+
+from genetictabler.export import timetable_rows
+
+COLUMNS = ["class", "day", "slot", "course", "subject"]
+TEMPLATE = os.path.join(os.path.dirname(__file__), "timetable.html")
+
+
+def default_names(tables, subject_names=None, day_names=None,
+                  class_names=None):
+    """
+    Fills in the name maps a writer was not given: subjects are named by their
+        course code, days "Day 1", "Day 2", ... and classes "Class 1", ...
+    """
+    days = len(tables[0]) if tables else 0
+    if subject_names is None:
+        subject_names = {}
+    if day_names is None:
+        day_names = [f"Day {n}" for n in range(1, days + 1)]
+    if class_names is None:
+        class_names = [f"Class {n}" for n in range(1, len(tables) + 1)]
+    return subject_names, day_names, class_names
+
+
+@contextmanager
+def open_target(target, mode="w"):
+    """
+    Yields `target` if it is a file object, otherwise opens it as a path.
+    """
+    if hasattr(target, "write"):
+        yield target
+    else:
+        newline = "" if "b" not in mode else None
+        with open(target, mode, newline=newline,
+                  encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+
+
+def iter_records(tables, subject_names=None, day_names=None,
+                 class_names=None):
+    """
+    Yields one (class, day, slot, course, subject) tuple per cell, class by
+        class. Slots are numbered from 1; empty cells have course 0 and an empty
+        subject.
+    """
+    subject_names, day_names, class_names = default_names(
+        tables, subject_names, day_names, class_names)
+    for class_name, class_table in zip(class_names, tables):
+        for day_idx, day in enumerate(class_table):
+            for slot_idx, course in enumerate(day, start=1):
+                subject = subject_names.get(course, course) if course else ""
+                yield (class_name, day_names[day_idx], slot_idx, course,
+                       subject)
+
+
+def write_csv(tables, target, subject_names=None, day_names=None,
+              class_names=None):
+    """
+    Writes one CSV row per cell, with a header row of COLUMNS.
+    """
+    with open_target(target) as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(
+            iter_records(tables, subject_names, day_names, class_names))
+
+
+def write_jsonl(tables, target, subject_names=None, day_names=None,
+                class_names=None):
+    """
+    Writes one JSON object per line and class, holding its "class" name, the
+        "days" names and its "courses" and "subjects" as [day][slot] grids.
+    """
+    subject_names, day_names, class_names = default_names(
+        tables, subject_names, day_names, class_names)
+    with open_target(target) as f:
+        for class_name, class_table in zip(class_names, tables):
+            record = {
+                "class": class_name,
+                "days": [day_names[i] for i in range(len(class_table))],
+                "courses": [list(day) for day in class_table],
+                "subjects": [[
+                    subject_names.get(course, course) if course else ""
+                    for course in day
+                ] for day in class_table],
+            }
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def write_parquet(tables, target, subject_names=None, day_names=None,
+                  class_names=None):
+    """
+    Writes the CSV columns to a Parquet file, one row group per class.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("write_parquet() requires pyarrow.") from e
+
+    subject_names, day_names, class_names = default_names(
+        tables, subject_names, day_names, class_names)
+    schema = pa.schema([
+        ("class", pa.string()),
+        ("day", pa.string()),
+        ("slot", pa.int16()),
+        ("course", pa.int16()),
+        ("subject", pa.string()),
+    ])
+    with pq.ParquetWriter(target, schema) as writer:
+        for class_name, class_table in zip(class_names, tables):
+            records = list(
+                iter_records([class_table], subject_names, day_names,
+                             [class_name]))
+            columns = [list(column) for column in zip(*records)]
+            columns[4] = [str(subject) for subject in columns[4]]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def write_html(tables, target, subject_names=None, day_names=None,
+               class_names=None, title="Timetable", start_hour=8):
+    """
+    Renders a page with one table per class from the timetable.html template,
+        using the same title, header and day rows as export_excel().
+    """
+    subject_names, day_names, class_names = default_names(
+        tables, subject_names, day_names, class_names)
+    with open(TEMPLATE, encoding="utf-8") as f:
+        head, tail = Template(f.read()).safe_substitute(
+            title=escape(title)).split("$tables")
+
+    with open_target(target) as f:
+        f.write(head)
+        for class_name, class_table in zip(class_names, tables):
+            rows = timetable_rows(class_table, class_name, subject_names,
+                                  day_names, start_hour)
+            f.write("        <table>\n")
+            f.write("            <caption>{}</caption>\n".format(
+                escape(str(rows[0][0]))))
+            f.write("            <tr>{}</tr>\n".format("".join(
+                "<th>{}</th>".format(escape(str(value)))
+                for value in rows[1])))
+            for row in rows[2:]:
+                f.write("            <tr><th>{}</th>{}</tr>\n".format(
+                    escape(str(row[0])), "".join(
+                        "<td>{}</td>".format(escape(str(value)))
+                        for value in row[1:])))
+            f.write("        </table>\n")
+        f.write(tail)
@@ -0,0 +1,52 @@
+"""
+The backtracking mode treats the fitness rules as hard constraints and keeps
+to its time budget, however large the problem.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+from genetictabler.resources import Resources, Room, Teacher
+
+
+@pytest.mark.parametrize("options", [
+    dict(classes=6, courses=5, slots=6, days=5, teachers=2, seed=1),
+    dict(classes=8, courses=4, slots=6, days=5, repeat=2, teachers=1, seed=2),
+    dict(classes=4, courses=3, slots=5, days=5, seed=4, resources=Resources(
+        [Teacher("a"), Teacher("b", courses=[1, 2]),
+         Teacher("c", unavailable=[(0, 1)])],
+        [Room("r1"), Room("r2"), Room("r3", unavailable=[(1, 2)])])),
+])
+def test_solution_breaks_no_hard_rule(options):
+    table = GenerateTimeTable(mode="backtracking", **options)
+    table.run()
+    report = table.solver_report
+    violations = table.violation_report()
+
+    assert report["assigned"] + report["skipped"] == report["cells"]
+    for rule in ("adjacent", "repeat", "teacher", "room"):
+        assert violations[rule] == 0
+
+
+@pytest.mark.parametrize("time_budget", [0.3, 1.0])
+def test_time_budget_bounds_large_solves(time_budget):
+    table = GenerateTimeTable(classes=200, courses=60, slots=10, days=6,
+                              teachers=4, mode="backtracking",
+                              time_budget=time_budget, seed=5)
+    table.run()
+    report = table.solver_report
+
+    assert report["timed_out"]
+    assert report["seconds"] < time_budget * 1.25 + 0.1
+    assert report["assigned"] + report["skipped"] == report["cells"]
+
+
+def test_seeded_runs_are_reproducible():
+    options = dict(classes=8, courses=4, slots=6, days=5, teachers=2,
+                   mode="backtracking", seed=9)
+    first = GenerateTimeTable(**options)
+    second = GenerateTimeTable(**options)
+
+    assert first.run() == second.run()
+    assert first.solver_report["backtracks"] == (
+        second.solver_report["backtracks"])
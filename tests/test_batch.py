@@ -0,0 +1,33 @@
+"""
+solve_many() yields every problem's result, and stopping early does not wait
+for the rest of the batch.
+"""
+
+import time
+
+from genetictabler.batch import solve_many
+
+
+def test_every_problem_yields_a_result():
+    configs = [dict(classes=3, courses=3, slots=4, days=3, seed=seed)
+               for seed in range(3)] + [dict(classes=3, mode="bogus")]
+    results = sorted(solve_many(configs, workers=2),
+                     key=lambda result: result.index)
+
+    assert [result.index for result in results] == [0, 1, 2, 3]
+    assert all(result.error is None for result in results[:3])
+    assert results[3].tables is None and results[3].error
+
+
+def test_stopping_early_cancels_the_remaining_problems():
+    configs = [dict(classes=20, courses=10, slots=8, days=5, seed=seed)
+               for seed in range(8)]
+    results = solve_many(configs, workers=2)
+    start = time.perf_counter()
+    first = next(results)
+    first_seconds = time.perf_counter() - start
+    results.close()
+
+    assert first.error is None
+    # The six problems not started yet would take at least three more rounds.
+    assert time.perf_counter() - start < 2 * first_seconds
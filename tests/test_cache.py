@@ -0,0 +1,29 @@
+"""
+A cache hit must leave the generator in the state of the solve that stored the
+entry.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+from genetictabler.cache import MemoryCache
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("options", [
+    dict(classes=4, courses=4, slots=5, days=3),
+    dict(classes=4, courses=4, slots=5, days=3, mode="timetable"),
+    dict(classes=4, courses=4, slots=5, days=3, storage="compact"),
+])
+def test_cache_hit_restores_the_solved_state(options, seed):
+    cache = MemoryCache()
+    solved = GenerateTimeTable(cache=cache, seed=seed, **options)
+    tables = solved.run()
+    hit = GenerateTimeTable(cache=cache, seed=seed, **options)
+
+    assert hit.run() == tables
+    assert hit.cache_hit
+    assert [list(quota) for quota in hit.course_quota] == [
+        list(quota) for quota in solved.course_quota
+    ]
+    assert hit.violation_report() == solved.violation_report()
@@ -0,0 +1,62 @@
+"""
+Resuming an interrupted seeded solve from its checkpoint must end with the
+timetable of the uninterrupted run.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+from genetictabler.checkpoint import load_checkpoint, resume
+
+
+class Interrupt(Exception):
+    pass
+
+
+def interrupted_run(path, stop_after, **options):
+    """
+    Runs a solve that checkpoints after every step and aborts it from the
+        progress_callback on its stop_after-th progress event.
+    """
+    events = []
+
+    def progress_callback(progress):
+        events.append(progress)
+        if len(events) == stop_after:
+            raise Interrupt
+
+    table = GenerateTimeTable(checkpoint_path=str(path), checkpoint_interval=0,
+                              progress_callback=progress_callback, **options)
+    with pytest.raises(Interrupt):
+        table.run()
+
+
+def as_lists(tables):
+    return [[list(day) for day in class_table] for class_table in tables]
+
+
+@pytest.mark.parametrize("options", [
+    dict(classes=4, courses=5, slots=5, days=5, seed=3),
+    dict(classes=4, courses=5, slots=5, days=5, seed=3, storage="compact"),
+])
+def test_cell_mode_resume_matches_uninterrupted_run(tmp_path, options):
+    expected = as_lists(GenerateTimeTable(**options).run())
+    path = tmp_path / "run.ckpt"
+    interrupted_run(path, 7, **options)
+
+    assert not load_checkpoint(path)["complete"]
+    assert as_lists(resume(path).tables) == expected
+
+
+@pytest.mark.parametrize("stop_after", [3, 15, 29, 33])
+def test_timetable_mode_resume_keeps_convergence_state(tmp_path, stop_after):
+    # With patience and adaptive mutation the run depends on the stale count
+    # and mutation rounds carried between generations.
+    options = dict(classes=6, courses=5, slots=5, mode="timetable",
+                   population_size=20, max_generations=80, patience=6,
+                   min_diversity=0.9, seed=11)
+    expected = as_lists(GenerateTimeTable(**options).run())
+    path = tmp_path / "run.ckpt"
+    interrupted_run(path, stop_after, **options)
+
+    assert as_lists(resume(path).tables) == expected
@@ -0,0 +1,83 @@
+"""
+resolve() only clears the cells a constraint change breaks, refills them (and
+any cell the solve left empty) and keeps the new limits for later calls.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+
+OPTIONS = dict(classes=4, courses=4, slots=5, days=3, teachers=2, seed=3)
+
+
+def as_lists(tables):
+    return [[list(day) for day in class_table] for class_table in tables]
+
+
+def cells(tables):
+    return {(class_idx, day_idx, slot_idx): course
+            for class_idx, class_table in enumerate(tables)
+            for day_idx, day in enumerate(class_table)
+            for slot_idx, course in enumerate(day)}
+
+
+def solved():
+    table = GenerateTimeTable(**OPTIONS)
+    return table, as_lists(table.run())
+
+
+def test_teacher_change_only_replaces_that_course():
+    table, before = solved()
+    table.resolve(teachers={1: 1})
+    after = cells(table.tables)
+
+    assert table.teachers == [1, 2, 2, 2]
+    assert list(table.teacher_quota) == [1, 2, 2, 2]
+    assert not table.free_cells
+    for cell, course in cells(before).items():
+        if course not in (0, 1):
+            assert after[cell] == course
+
+
+def test_repeat_change_only_replaces_that_course():
+    table, before = solved()
+    table.resolve(repeat={2: 1})
+    after = cells(table.tables)
+
+    assert table.repeat == [2, 1, 2, 2]
+    assert all(list(quota)[1] == 1 for quota in table.repeat_quota)
+    assert not table.free_cells
+    for cell, course in cells(before).items():
+        if course not in (0, 2):
+            assert after[cell] == course
+
+
+def test_class_change_keeps_the_other_classes():
+    table, before = solved()
+    table.resolve(classes=[1])
+    after = cells(table.tables)
+
+    assert not table.free_cells
+    for cell, course in cells(before).items():
+        if course and cell[0] != 1:
+            assert after[cell] == course
+
+
+def test_changed_limits_persist_through_a_reload():
+    table, before = solved()
+    table.resolve(teachers={1: 1}, repeat={2: 1})
+    table.resolve(tables=before)
+
+    assert list(table.teacher_quota) == [1, 2, 2, 2]
+    assert all(list(quota)[1] == 1 for quota in table.repeat_quota)
+
+
+@pytest.mark.parametrize("draws", [1, 2, 3])
+def test_reload_quotas_do_not_depend_on_rng_history(draws):
+    table, before = solved()
+    expected = [list(quota) for quota in table.course_quota]
+    for _ in range(draws):
+        table.rng.random()
+    table.load_tables(before)
+
+    assert [list(quota) for quota in table.course_quota] == expected
@@ -0,0 +1,34 @@
+"""
+With resources, the "timetable" mode scores the teacher and room clashes that
+fit_timetable() leaves, including unavailable slots and too few rooms.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+from genetictabler.resources import Resources, Room, Teacher
+
+
+def resources():
+    return Resources(
+        [Teacher("a"), Teacher("b", courses=[1, 2]),
+         Teacher("c", courses=[3], unavailable=[(0, 0), (0, 1), (1, 2)])],
+        [Room("r1"), Room("r2", unavailable=[(0, 2), (2, 3)])])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_timetable_score_counts_resource_clashes(seed):
+    table = GenerateTimeTable(classes=3, courses=3, slots=4, days=3,
+                              mode="timetable", population_size=20,
+                              max_generations=30, resources=resources(),
+                              seed=seed)
+    table.run()
+    individual = [[course for day in class_table for course in day]
+                  for class_table in table.tables]
+    report = table.violation_report()
+
+    # Three classes share two rooms, so some slots always clash.
+    assert report["room"] > 0
+    assert table.timetable_violations(individual) == (
+        report["adjacent"] + report["repeat"] + report["teacher"] +
+        report["room"])
@@ -0,0 +1,21 @@
+"""
+A sweep keeps going when some of its runs fail, and leaves their
+configurations off the Pareto front.
+"""
+
+from genetictabler.tuning import format_table, run_sweep, summarize
+
+
+def test_failed_runs_do_not_end_the_sweep():
+    space = {"population_size": [10, -5], "max_generations": [5]}
+    results = summarize(
+        run_sweep((4, 4, 5, 3), space, seeds=2, workers=1, log=None))
+    solved, failed = results
+
+    assert solved["params"]["population_size"] == 10
+    assert len(solved["runs"]) == 2 and not solved["errors"]
+    assert solved["pareto"]
+    assert failed["params"]["population_size"] == -5
+    assert not failed["runs"] and len(failed["errors"]) == 2
+    assert not failed["pareto"] and failed["wall_time_mean"] is None
+    assert format_table(results)
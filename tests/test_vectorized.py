@@ -0,0 +1,54 @@
+"""
+The vectorized fitness path must return exactly the scores of the scalar
+calculate_fitness(), so vectorized=True never changes a solve.
+"""
+
+import pytest
+
+from genetictabler import GenerateTimeTable
+from genetictabler.resources import Resources, Room, Teacher
+
+np = pytest.importorskip("numpy")
+
+
+def busy_table(fill=0.5, **options):
+    """
+    Builds a vectorized generator and places random genes until about `fill`
+        of its cells hold a course.
+    """
+    table = GenerateTimeTable(vectorized=True, **options)
+    table.initialize_genotype(table.courses, table.classes, table.slots,
+                              table.days, table.repeat, table.teachers)
+    table.generate_table_skeleton()
+    target = int(table.total_slots * table.class_count * fill)
+    while table.filled_slots < target:
+        table.fit_slot(table.generate_gene())
+    return table
+
+
+@pytest.mark.parametrize("options", [
+    dict(classes=6, courses=5, slots=6, days=5, teachers=2, seed=1),
+    dict(classes=5, courses=4, slots=7, days=5, repeat=[1, 2, 1, 2],
+         teachers=[1, 2, 2, 1], seed=2),
+    dict(classes=4, courses=4, slots=5, days=5, seed=3, storage="compact"),
+    dict(classes=4, courses=3, slots=5, days=5, seed=4, resources=Resources(
+        [Teacher("a"), Teacher("b", courses=[1, 2])],
+        [Room("r1"), Room("r2", unavailable=[(0, 0), (1, 2)])])),
+])
+@pytest.mark.parametrize("fill", [0.0, 0.5, 0.9])
+def test_population_scores_match_scalar_scores(options, fill):
+    table = busy_table(fill, **options)
+    genes = table.generate_population(400)
+
+    assert table.calculate_population_fitness(genes) == [
+        table.calculate_fitness(gene) for gene in genes
+    ]
+
+
+@pytest.mark.parametrize("mode", ["cell", "timetable"])
+def test_seeded_runs_match_scalar_runs(mode):
+    options = dict(classes=5, courses=5, slots=6, days=5, mode=mode, seed=7)
+    scalar = GenerateTimeTable(**options).run()
+    vectorized = GenerateTimeTable(vectorized=True, **options).run()
+
+    assert vectorized == scalar